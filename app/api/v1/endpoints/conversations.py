@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import math
@@ -21,6 +22,8 @@ from app.dependencies.services import get_conversation_service
 from app.core.models import User
 from app.guards import get_current_active_user
 from app.utils.response import ResponseUtil
+from app.utils.sse import with_keepalive
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -193,10 +196,14 @@ async def send_message(
     
     - **conversation_id**: 对话ID
     - **content**: 消息内容
+    - **no_cache**: 是否跳过语义缓存（默认false）
     """
     try:
-        message = conversation_service.send_message(
-            request.conversation_id, request.content, current_user.id
+        # send_message is fully synchronous (DB, semantic cache embedding, OpenAI)
+        message = await run_in_threadpool(
+            conversation_service.send_message,
+            request.conversation_id, request.content, current_user.id,
+            no_cache=request.no_cache
         )
         
         if not message:
@@ -239,6 +246,7 @@ async def chat_stream(
     - **conversation_id**: 对话ID
     - **message**: 用户消息内容
     - **stream**: 是否流式响应（默认true）
+    - **no_cache**: 是否跳过语义缓存（默认false）
     
     返回Server-Sent Events流，包含以下类型的数据：
     - **message**: 用户消息确认
@@ -246,14 +254,14 @@ async def chat_stream(
     - **done**: 响应完成
     - **error**: 错误信息
     """
-    def generate():
-        for chunk in conversation_service.send_message_stream(
-            request.conversation_id, request.message, current_user.id
-        ):
-            yield f"data: {chunk}\n\n"
+    # send_message_stream yields complete SSE frames as bytes
+    frames = conversation_service.send_message_stream(
+        request.conversation_id, request.message, current_user.id,
+        no_cache=request.no_cache
+    )
 
     return StreamingResponse(
-        generate(),
+        with_keepalive(frames, settings.SSE_KEEPALIVE_INTERVAL),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
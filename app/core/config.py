@@ -80,12 +80,34 @@ class Settings(BaseSettings):
     # OpenAI 配置
     OPENAI_API_KEY: Optional[str] = None
     LLM_MODEL: str = "gpt-4o-mini"
+    LLM_CONTEXT_WINDOW: int = 128000  # 模型上下文窗口（token），超出时裁剪检索上下文
+    LLM_MAX_OUTPUT_TOKENS: int = 500  # RAG 回答的最大输出 token 数
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # OpenAI 共享连接池配置
+    OPENAI_HTTP2: bool = True  # 需要安装 h2 (httpx[http2])
+    OPENAI_MAX_CONNECTIONS: int = 256  # 流式响应会长时间占用连接，上限需覆盖并发会话数
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 64
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0  # 秒
+    OPENAI_TIMEOUT: float = 60.0  # 秒，非流式补全需等待完整生成
+    OPENAI_CONNECT_TIMEOUT: float = 5.0  # 秒
+    OPENAI_PING_TIMEOUT: float = 5.0  # 秒，连通性探测不重试，避免 OpenAI 不可达时拖慢启动和健康检查
+    OPENAI_PROMPT_CACHE_KEY_ENABLED: bool = True  # 按系统提示词发送 prompt_cache_key，提升前缀缓存命中
+    OPENAI_HEALTH_CHECK_INTERVAL: float = 30.0  # 秒，健康检查结果的缓存时间，期间不重复探测 OpenAI
     
     # RAG 系统配置 (默认启用)
     RAG_MEMORY_TYPE: str = "graph"  # graph, simple, etc.
     RAG_MAX_CONTEXT_RESULTS: int = 5
     RAG_MEMORY_COLLECTION: str = "ai_agents_rag_memory"
+    RAG_CONTEXT_CACHE_TTL: int = 120  # 秒，同一对话内检索结果复用时间
+    RAG_CONTEXT_CACHE_THRESHOLD: float = 0.95
+    MEMORY_EXECUTOR_WORKERS: int = 64  # 记忆读写专用线程池大小
+    RAG_STATS_CACHE_TTL: float = 5.0  # 秒，统计信息缓存时间，避免监控轮询反复汇总各组件
+    RAG_GENERATION_TIMEOUT: float = 60.0  # 秒，单次回答生成（含流式）的总时限，超时后走降级回复
+    
+    # 语义响应缓存配置（按对话隔离，相似问题只在同一对话内复用回答）
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 86400  # 秒
     
     # Web Search 配置
     SEARCH_PROVIDER: str = "auto"  # auto, duckduckgo, serper, mock
@@ -99,6 +121,7 @@ class Settings(BaseSettings):
     
     # 对话配置
     MAX_CONVERSATION_CONTEXT: int = 10
+    SSE_KEEPALIVE_INTERVAL: float = 15.0  # 秒，流式响应空闲时发送注释帧的间隔
     CONVERSATION_MEMORY_ENABLED: bool = True
 
     class Config:
@@ -0,0 +1,77 @@
+"""
+共享 OpenAI 客户端
+进程内所有调用复用同一个 httpx 连接池（keep-alive，可选 HTTP/2），避免每次请求重新建立 TCP/TLS 连接
+"""
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+import openai
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# HTTP/2 依赖 h2 包，未安装时退回 HTTP/1.1
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+def _http_client_options() -> dict:
+    """连接池参数，同步与异步客户端共用"""
+    return {
+        "http2": settings.OPENAI_HTTP2 and HTTP2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+    }
+
+
+@lru_cache()
+def get_http_client() -> httpx.Client:
+    """
+    进程级共享的同步 httpx 连接池
+    LangChain 的 ChatOpenAI / OpenAIEmbeddings 通过 http_client 参数复用它，避免每个实例各建一个连接池
+    """
+    return openai.DefaultHttpxClient(**_http_client_options())
+
+
+@lru_cache()
+def get_async_http_client() -> httpx.AsyncClient:
+    """进程级共享的异步 httpx 连接池"""
+    return openai.DefaultAsyncHttpxClient(**_http_client_options())
+
+
+@lru_cache()
+def get_openai_client() -> openai.OpenAI:
+    """进程级共享的同步 OpenAI 客户端"""
+    return openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=get_http_client()
+    )
+
+
+@lru_cache()
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    """进程级共享的异步 OpenAI 客户端"""
+    return openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=get_async_http_client()
+    )
+
+
+def ping_openai(model: Optional[str] = None) -> bool:
+    """
+    通过 /v1/models 探测 OpenAI 连通性（只读取模型元数据，不消耗 token）
+    使用共享客户端（共用连接池），成功时顺带预热连接池；
+    探测不重试并使用较短超时，OpenAI 不可达时最多阻塞 OPENAI_PING_TIMEOUT 秒
+    """
+    try:
+        client = get_openai_client().with_options(max_retries=0, timeout=settings.OPENAI_PING_TIMEOUT)
+        client.models.retrieve(model or settings.OPENAI_EMBEDDING_MODEL)
+        return True
+    except Exception as e:
+        logger.warning(f"OpenAI 连通性检查失败: {e}")
+        return False
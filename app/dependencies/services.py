@@ -13,6 +13,7 @@ from app.services.knowledge_extractor import KnowledgeExtractor
 from app.services.digital_human_training_service import DigitalHumanTrainingService
 from app.services.graph_service import GraphService
 from app.services.conversation_service import ConversationService
+from app.services.rag.conversation_service import ConversationService as RAGConversationService
 from app.dependencies.graph import get_graph_service
 
 
@@ -51,11 +52,17 @@ def get_knowledge_extractor() -> KnowledgeExtractor:
     return KnowledgeExtractor()
 
 
+@lru_cache()
+def get_rag_conversation_service() -> RAGConversationService:
+    return RAGConversationService()
+
+
 def get_conversation_service(
     db: Session = Depends(get_db),
-    langgraph_service: LangGraphService = Depends(get_langgraph_service)
+    langgraph_service: LangGraphService = Depends(get_langgraph_service),
+    rag_service: RAGConversationService = Depends(get_rag_conversation_service)
 ) -> ConversationService:
-    return ConversationService(db, langgraph_service)
+    return ConversationService(db, langgraph_service, rag_service)
 
 
 def get_training_message_repository(
@@ -8,7 +8,9 @@ from app.core.models import Base
 from app.api.v1.router import api_router
 from alembic.config import Config
 from alembic import command
+import asyncio
 import os
+import sys
 import time
 import traceback
 
@@ -18,6 +20,10 @@ from app.core.mongodb import init_mongodb, close_mongodb
 
 from app.core.neomodel_config import setup_neomodel
 
+from app.core.openai_client import ping_openai
+
+from app.services.rag.rag_service import warm_up_tokenizer
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -105,6 +111,11 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.on_event("startup")
 async def startup_event():
+    # Python 3.12+: 不会挂起的协程（缓存命中等）在 create_task 时直接同步执行完毕
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        logger.info("⚡ 已启用 asyncio eager task factory")
+    
     max_retries = 2
     retry_interval = 1
     
@@ -156,6 +167,18 @@ async def startup_event():
     except Exception as e:
         logger.error(f"❌ Neo4j Neomodel 初始化失败: {e}")
         logger.warning("⚠️ 应用将继续运行，但图数据库功能将不可用")
+    
+    logger.info("🔄 正在预热 OpenAI 连接池...")
+    if await asyncio.to_thread(ping_openai):
+        logger.success("✅ OpenAI 连接池预热完成!")
+    else:
+        logger.warning("⚠️ OpenAI 暂不可用，连接将在首次调用时建立")
+    
+    logger.info("🔄 正在预加载 tiktoken 编码...")
+    if await asyncio.to_thread(warm_up_tokenizer):
+        logger.success("✅ tiktoken 编码预加载完成!")
+    else:
+        logger.warning("⚠️ tiktoken 不可用，将按字符数估算 token")
 
 
 @app.on_event("shutdown")
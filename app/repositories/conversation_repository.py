@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, desc, select, Row
 from typing import List, Optional, Tuple
 from app.core.models import Conversation, Message, DigitalHuman
 from app.schemas.conversation import ConversationCreate, ConversationUpdate, ConversationPageRequest
@@ -66,6 +66,22 @@ class ConversationRepository:
             )
         ).first()
     
+    def get_conversation_with_digital_human(
+        self,
+        conversation_id: int,
+        user_id: int
+    ) -> Optional[Conversation]:
+        """根据ID获取对话，并通过JOIN同时加载数字人模板"""
+        return self.db.query(Conversation).options(
+            joinedload(Conversation.digital_human_template)
+        ).filter(
+            and_(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id,
+                Conversation.status != "deleted"
+            )
+        ).first()
+    
     def get_conversations_paginated(
         self,
         page_request: ConversationPageRequest,
@@ -188,6 +204,42 @@ class MessageRepository:
         
         return message
     
+    def create_messages(self, conversation_id: int, messages: List[dict]) -> List[int]:
+        """
+        在同一事务中批量创建消息，返回新消息ID（与传入顺序一致）
+        每项包含 role/content，可选 tokens_used/metadata/created_at
+        """
+        rows = []
+        for item in messages:
+            row = Message(
+                conversation_id=conversation_id,
+                role=item["role"],
+                content=item["content"],
+                tokens_used=item.get("tokens_used"),
+                message_metadata=item.get("metadata")
+            )
+            # 未提供时不赋值，由数据库的 server_default 填充 created_at
+            if item.get("created_at") is not None:
+                row.created_at = item["created_at"]
+            rows.append(row)
+        self.db.add_all(rows)
+        
+        # 更新对话的最后消息时间（直接UPDATE，无需先查询）
+        now = datetime.now()
+        self.db.query(Conversation).filter(
+            Conversation.id == conversation_id
+        ).update(
+            {Conversation.last_message_at: now, Conversation.updated_at: now},
+            synchronize_session=False
+        )
+        
+        # flush 后主键已分配，在提交前读取以免提交后重新加载
+        self.db.flush()
+        message_ids = [row.id for row in rows]
+        self.db.commit()
+        
+        return message_ids
+    
     def get_conversation_messages(
         self,
         conversation_id: int,
@@ -196,13 +248,39 @@ class MessageRepository:
         """获取对话的所有消息"""
         query = self.db.query(Message).filter(
             Message.conversation_id == conversation_id
-        ).order_by(Message.created_at)
+        ).order_by(Message.created_at, Message.id)
         
         if limit:
             query = query.limit(limit)
         
         return query.all()
     
+    def get_conversation_messages_core(
+        self,
+        conversation_id: int,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """获取对话的所有消息（仅查询列，不构建ORM对象）
+        
+        列顺序: id, conversation_id, role, content, tokens_used, message_metadata, created_at
+        """
+        stmt = select(
+            Message.id,
+            Message.conversation_id,
+            Message.role,
+            Message.content,
+            Message.tokens_used,
+            Message.message_metadata,
+            Message.created_at
+        ).where(
+            Message.conversation_id == conversation_id
+        ).order_by(Message.created_at, Message.id)
+        
+        if limit:
+            stmt = stmt.limit(limit)
+        
+        return self.db.execute(stmt).all()
+    
     def get_recent_messages(
         self,
         conversation_id: int,
@@ -211,7 +289,7 @@ class MessageRepository:
         """获取最近的消息"""
         return self.db.query(Message).filter(
             Message.conversation_id == conversation_id
-        ).order_by(desc(Message.created_at)).limit(limit).all()
+        ).order_by(desc(Message.created_at), desc(Message.id)).limit(limit).all()
     
     def delete_conversation_messages(self, conversation_id: int) -> bool:
         """删除对话的所有消息"""
@@ -115,6 +115,7 @@ class ConversationSendRequest(BaseModel):
     """发送消息请求模型"""
     conversation_id: int = Field(..., description="对话ID")
     content: str = Field(..., description="消息内容")
+    no_cache: bool = Field(default=False, description="是否跳过语义缓存（敏感对话）")
 
 
 class ConversationChatRequest(BaseModel):
@@ -122,6 +123,7 @@ class ConversationChatRequest(BaseModel):
     conversation_id: int = Field(..., description="对话ID")
     message: str = Field(..., description="用户消息内容")
     stream: bool = Field(default=True, description="是否流式响应")
+    no_cache: bool = Field(default=False, description="是否跳过语义缓存（敏感对话）")
 
 
 class ConversationClearRequest(BaseModel):
@@ -1,45 +1,44 @@
 """
 Services module for ai-agents-fork
 Enhanced with RAG capabilities as the default conversation pipeline
-"""
 
-# RAG Services (Default Pipeline)
-from .rag import RAGService, ConversationService as RAGConversationService
-from .memory import MemoryManager, GraphMemorySystem
-from .search import WebSearchService
+Service classes are imported lazily (PEP 562) so touching app.services does not
+pull in ChromaDB, the OpenAI SDK or LangGraph until the class is actually used.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-# Legacy services for compatibility
-from .conversation_service import ConversationService
-from .langgraph_service import LangGraphService
+if TYPE_CHECKING:
+    from .rag import RAGService, ConversationService as RAGConversationService
+    from .memory import MemoryManager, GraphMemorySystem
+    from .search import WebSearchService
+    from .conversation_service import ConversationService
+    from .langgraph_service import LangGraphService
 
-__all__ = [
+_LAZY_IMPORTS = {
     # RAG Pipeline (Primary)
-    "RAGService",
-    "RAGConversationService", 
-    "MemoryManager",
-    "GraphMemorySystem",
-    "WebSearchService",
+    "RAGService": (".rag.rag_service", "RAGService"),
+    "RAGConversationService": (".rag.conversation_service", "ConversationService"),
+    "MemoryManager": (".memory.memory_manager", "MemoryManager"),
+    "GraphMemorySystem": (".memory.graph_memory", "GraphMemorySystem"),
+    "WebSearchService": (".search.web_search_service", "WebSearchService"),
     
     # Legacy/Compatibility
-    "ConversationService",
-    "LangGraphService"
-]
-
-# Service initialization info
-PIPELINE_INFO = {
-    "default_pipeline": "RAG",
-    "features": [
-        "Memory-enhanced conversations",
-        "Real-time web search integration", 
-        "Semantic context retrieval",
-        "Fact extraction and persistence",
-        "Intent-based routing",
-        "GraphRAG ready architecture"
-    ],
-    "components": {
-        "memory": "ChromaDB + OpenAI Embeddings",
-        "search": "Multi-provider (DuckDuckGo, Serper, Mock)",
-        "llm": "OpenAI GPT models",
-        "routing": "LangGraph-inspired conditional flows"
-    }
-}
\ No newline at end of file
+    "ConversationService": (".conversation_service", "ConversationService"),
+    "LangGraphService": (".langgraph_service", "LangGraphService"),
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module_name, attr = _LAZY_IMPORTS[name]
+        value = getattr(import_module(module_name, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,26 +1,62 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional, Tuple, Generator, Dict, Any
+from typing import List, Optional, Tuple, AsyncGenerator, Dict, Any, Mapping
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
 from app.repositories.conversation_repository import ConversationRepository, MessageRepository
 from app.services.langgraph_service import LangGraphService
 from app.services.rag.conversation_service import ConversationService as RAGConversationService
+from app.services.rag.semantic_cache import SemanticResponseCache
 from app.core.models import Conversation, Message, DigitalHuman
+from app.core.config import settings
+from app.core.logger import logger
+from app.utils.sse import event_frame, token_frame
 from app.schemas.conversation import *
-import json
-import asyncio
+import threading
+
+
+@dataclass(frozen=True, slots=True)
+class DigitalHumanConfig:
+    """Immutable per-template settings used on the message hot path"""
+    name: Optional[str] = None
+    type: Optional[str] = None
+    skills: Tuple[str, ...] = ()
+    # Read-only view: configs are shared across requests through the process cache
+    personality: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    conversation_style: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    system_prompt: Optional[str] = None
+    system_prompt_hash: str = SemanticResponseCache.prompt_hash(None)
+
+
+_EMPTY_DIGITAL_HUMAN_CONFIG = DigitalHumanConfig()
+
+# Configs keyed by (digital_human_id, updated_at): editing a template bumps
+# updated_at, so stale entries are simply never hit again and age out
+_DH_CONFIG_CACHE_SIZE = 256
+_dh_config_cache: "OrderedDict[Tuple[int, Optional[datetime]], DigitalHumanConfig]" = OrderedDict()
+_dh_config_lock = threading.Lock()
 
 
 class ConversationService:
     
-    def __init__(self, db: Session, langgraph_service: LangGraphService):
+    def __init__(
+        self,
+        db: Session,
+        langgraph_service: LangGraphService,
+        rag_service: Optional[RAGConversationService] = None
+    ):
         self.db = db
         self.conversation_repo = ConversationRepository(db)
         self.message_repo = MessageRepository(db)
         # Keep LangGraph service for thread ID generation only
         self.langgraph_service = langgraph_service
         
-        # Initialize RAG conversation service as the default pipeline
-        self.rag_service = RAGConversationService()
-        print("[CONVERSATION_SERVICE] RAG pipeline initialized as default")
+        # RAG conversation service is the default pipeline; share it across requests when provided
+        self.rag_service = rag_service or RAGConversationService()
     
     def create_conversation(
         self,
@@ -95,12 +131,12 @@ class ConversationService:
         if not conversation:
             return None
         
-        messages = self.message_repo.get_conversation_messages(
+        rows = self.message_repo.get_conversation_messages_core(
             conversation_id, message_limit
         )
         
         conversation_response = ConversationResponse.from_orm(conversation)
-        message_responses = [MessageResponse.from_orm(msg) for msg in messages]
+        message_responses = self._build_message_responses(rows)
         
         return ConversationWithMessages(
             **conversation_response.dict(),
@@ -111,9 +147,10 @@ class ConversationService:
         self,
         conversation_id: int,
         message_content: str,
-        user_id: int
+        user_id: int,
+        no_cache: bool = False
     ) -> Optional[MessageResponse]:
-        conversation = self.conversation_repo.get_conversation_by_id(
+        conversation = self.conversation_repo.get_conversation_with_digital_human(
             conversation_id, user_id
         )
         if not conversation:
@@ -125,11 +162,27 @@ class ConversationService:
         
         # Use RAG as the default and only pipeline
         digital_human_config = self._get_digital_human_config(
-            conversation.digital_human_id
+            conversation.digital_human_template
         )
-        system_prompt = digital_human_config.get('system_prompt')
+        system_prompt = digital_human_config.system_prompt
+        system_prompt_hash = digital_human_config.system_prompt_hash
+        
+        response_cache = self.rag_service.rag_service.response_cache
+        use_cache = settings.SEMANTIC_CACHE_ENABLED and not no_cache
         
         try:
+            if use_cache:
+                cached_response = response_cache.lookup(
+                    user_id, conversation.digital_human_id, conversation.thread_id,
+                    message_content, system_prompt_hash=system_prompt_hash
+                )
+                if cached_response is not None:
+                    ai_message = self.message_repo.create_message(
+                        conversation_id, "assistant", cached_response,
+                        metadata={"semantic_cache_hit": True}
+                    )
+                    return MessageResponse.from_orm(ai_message)
+            
             # Use RAG service synchronously
             rag_response = self.rag_service.rag_service.chat_sync(
                 user_message=message_content,
@@ -147,7 +200,16 @@ class ConversationService:
             if hasattr(ai_message, 'metadata') and rag_response.metadata:
                 ai_message.metadata = rag_response.metadata
             
-            print(f"[CONVERSATION_SERVICE] RAG response - Memory: {rag_response.memory_used}, Web: {rag_response.web_results}, Time: {rag_response.processing_time}s")
+            if use_cache and not rag_response.error:
+                response_cache.store(
+                    user_id, conversation.digital_human_id, conversation.thread_id,
+                    message_content, rag_response.response, system_prompt_hash=system_prompt_hash
+                )
+            
+            logger.debug(
+                "[CONVERSATION_SERVICE] RAG response - Memory: {}, Web: {}, Time: {}s",
+                rag_response.memory_used, rag_response.web_results, rag_response.processing_time
+            )
             
             return MessageResponse.from_orm(ai_message)
             
@@ -156,38 +218,38 @@ class ConversationService:
         except Exception as e:
             raise ValueError(f"RAG消息发送失败: {str(e)}")
     
-    def send_message_stream(
+    async def send_message_stream(
         self,
         conversation_id: int,
         message_content: str,
-        user_id: int
-    ) -> Generator[str, None, None]:
-        conversation = self.conversation_repo.get_conversation_by_id(
+        user_id: int,
+        no_cache: bool = False
+    ) -> AsyncGenerator[bytes, None]:
+        # The repositories use a sync Session; keep MySQL round-trips off the event loop
+        conversation = await run_in_threadpool(
+            self.conversation_repo.get_conversation_with_digital_human,
             conversation_id, user_id
         )
         if not conversation:
-            yield json.dumps({
+            yield event_frame({
                 "type": "error",
                 "content": "对话不存在或无权限访问"
             })
             return
         
-        try:
-            user_message = self.message_repo.create_message(
-                conversation_id, "user", message_content
-            )
-        except Exception as e:
-            yield json.dumps({
-                "type": "error",
-                "content": f"保存消息失败: {str(e)}"
-            })
-            return
+        # The user turn is written together with the reply in one transaction once
+        # the stream finishes, so the first event does not wait on a DB round-trip
+        pending_messages = [{
+            "role": "user",
+            "content": message_content,
+            "created_at": datetime.now()
+        }]
 
-        yield json.dumps({
+        yield event_frame({
             "type": "message",
             "content": "",
             "metadata": {
-                "message_id": user_message.id,
+                "message_id": None,
                 "role": "user",
                 "content": message_content
             }
@@ -195,114 +257,140 @@ class ConversationService:
 
         # Use RAG streaming as the default and only pipeline
         digital_human_config = self._get_digital_human_config(
-            conversation.digital_human_id
+            conversation.digital_human_template
         )
-        system_prompt = digital_human_config.get('system_prompt')
+        system_prompt = digital_human_config.system_prompt
+        system_prompt_hash = digital_human_config.system_prompt_hash
+        
+        response_cache = self.rag_service.rag_service.response_cache
+        use_cache = settings.SEMANTIC_CACHE_ENABLED and not no_cache
         
         try:
-            # Use async generator from RAG service
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Tokens are collected and joined once instead of re-concatenating the reply per token
+            chunks: List[str] = []
+            generation_error = None
+            cached_response = None
+            if use_cache:
+                cached_response = await response_cache.lookup_async(
+                    user_id, conversation.digital_human_id, conversation.thread_id,
+                    message_content, system_prompt_hash=system_prompt_hash
+                )
             
-            try:
-                async_generator = self.rag_service.stream_response_async(
+            if cached_response is not None:
+                chunks.append(cached_response)
+                yield token_frame(cached_response)
+            else:
+                async for data in self.rag_service.stream_response_dicts(
                     message=message_content,
                     user_id=user_id,
                     digital_human_id=conversation.digital_human_id,
                     conversation_id=conversation.thread_id,
                     system_prompt=system_prompt
+                ):
+                    data_type = data["type"]
+                    if data_type == "chunk":
+                        content = data["content"]
+                        chunks.append(content)
+                        yield token_frame(content)
+                    elif data_type == "metadata":
+                        yield event_frame({
+                            "type": "rag_metadata",
+                            "content": "",
+                            "metadata": data
+                        })
+                    elif data_type == "complete":
+                        generation_error = data.get("error")
+                        break
+                    elif data_type == "error":
+                        yield event_frame({
+                            "type": "error",
+                            "content": data.get("error", "RAG streaming error")
+                        })
+                        return
+            
+            full_response = "".join(chunks)
+            if cached_response is None and use_cache and full_response and not generation_error:
+                await response_cache.store_async(
+                    user_id, conversation.digital_human_id, conversation.thread_id,
+                    message_content, full_response, system_prompt_hash=system_prompt_hash
                 )
-                
-                full_response = ""
-                
-                async def process_stream():
-                    nonlocal full_response
-                    async for chunk in async_generator:
-                        # Parse the SSE format
-                        if chunk.startswith("data: "):
-                            data_str = chunk[6:].strip()
-                            if data_str:
-                                try:
-                                    data = json.loads(data_str)
-                                    if data.get("type") == "chunk":
-                                        content = data.get("content", "")
-                                        full_response += content
-                                        yield json.dumps({
-                                            "type": "token",
-                                            "content": content
-                                        })
-                                    elif data.get("type") == "metadata":
-                                        yield json.dumps({
-                                            "type": "rag_metadata",
-                                            "content": "",
-                                            "metadata": data
-                                        })
-                                    elif data.get("type") == "complete":
-                                        break
-                                    elif data.get("type") == "error":
-                                        yield json.dumps({
-                                            "type": "error",
-                                            "content": data.get("error", "RAG streaming error")
-                                        })
-                                        return
-                                except json.JSONDecodeError:
-                                    continue
-                
-                # Run the async generator
-                async_gen = process_stream()
-                try:
-                    while True:
-                        chunk = loop.run_until_complete(async_gen.__anext__())
-                        yield chunk
-                except StopAsyncIteration:
-                    pass
-                
-                # Save the AI message
-                try:
-                    ai_message = self.message_repo.create_message(
-                        conversation_id, "assistant", full_response
-                    )
-                except Exception as e:
-                    print(f"Warning: Failed to save AI message: {str(e)}")
-                    ai_message = None
+            
+            # Save the user and AI messages together
+            pending_messages.append({
+                "role": "assistant",
+                "content": full_response,
+                "created_at": datetime.now()
+            })
+            message_ids = await run_in_threadpool(
+                self._save_pending_messages, conversation_id, pending_messages
+            )
+            user_message_id, ai_message_id = message_ids or (None, None)
 
-                yield json.dumps({
-                    "type": "done",
-                    "content": "",
-                    "metadata": {
-                        "message_id": ai_message.id if ai_message else None,
-                        "tokens_used": ai_message.tokens_used if ai_message else None,
-                        "rag_pipeline": True
-                    }
-                })
-                
-            finally:
-                loop.close()
+            yield event_frame({
+                "type": "done",
+                "content": "",
+                "metadata": {
+                    "message_id": ai_message_id,
+                    "user_message_id": user_message_id,
+                    "tokens_used": None,
+                    "rag_pipeline": True
+                }
+            })
                 
         except Exception as e:
-            yield json.dumps({
+            yield event_frame({
                 "type": "error",
                 "content": f"RAG流式响应失败: {str(e)}"
             })
+        finally:
+            # Error paths and client disconnects still keep the user's message
+            if pending_messages:
+                await run_in_threadpool(
+                    self._save_pending_messages, conversation_id, pending_messages
+                )
     
-    def _get_digital_human_config(self, digital_human_id: int) -> Dict[str, Any]:
-        digital_human = self.db.query(DigitalHuman).filter(
-            DigitalHuman.id == digital_human_id
-        ).first()
-        
+    def _save_pending_messages(
+        self,
+        conversation_id: int,
+        pending_messages: List[Dict[str, Any]]
+    ) -> Optional[List[int]]:
+        """Insert queued messages in a single transaction and empty the queue"""
+        messages = list(pending_messages)
+        pending_messages.clear()
+        try:
+            return self.message_repo.create_messages(conversation_id, messages)
+        except Exception as e:
+            self.db.rollback()
+            logger.warning("[CONVERSATION_SERVICE] Failed to save messages: {}", e)
+            return None
+    
+    def _get_digital_human_config(self, digital_human: Optional[DigitalHuman]) -> DigitalHumanConfig:
         if not digital_human:
-            return {}
+            return _EMPTY_DIGITAL_HUMAN_CONFIG
         
-        return {
-            "name": digital_human.name,
-            "type": digital_human.type,
-            "skills": digital_human.skills or [],
-            "personality": digital_human.personality or {},
-            "conversation_style": digital_human.conversation_style,
-            "temperature": digital_human.temperature,
-            "max_tokens": digital_human.max_tokens,
-            "system_prompt": digital_human.system_prompt
-        }
+        key = (digital_human.id, digital_human.updated_at)
+        with _dh_config_lock:
+            config = _dh_config_cache.get(key)
+            if config is not None:
+                _dh_config_cache.move_to_end(key)
+                return config
+        
+        config = DigitalHumanConfig(
+            name=digital_human.name,
+            type=digital_human.type,
+            skills=tuple(digital_human.skills or ()),
+            personality=MappingProxyType(dict(digital_human.personality or {})),
+            conversation_style=digital_human.conversation_style,
+            temperature=digital_human.temperature,
+            max_tokens=digital_human.max_tokens,
+            system_prompt=digital_human.system_prompt,
+            system_prompt_hash=SemanticResponseCache.prompt_hash(digital_human.system_prompt)
+        )
+        with _dh_config_lock:
+            _dh_config_cache[key] = config
+            if len(_dh_config_cache) > _DH_CONFIG_CACHE_SIZE:
+                _dh_config_cache.popitem(last=False)
+        return config
     
     def get_conversation_messages(
         self,
@@ -316,11 +404,27 @@ class ConversationService:
         if not conversation:
             return []
         
-        messages = self.message_repo.get_conversation_messages(
+        rows = self.message_repo.get_conversation_messages_core(
             conversation_id, limit
         )
         
-        return [MessageResponse.from_orm(msg) for msg in messages]
+        return self._build_message_responses(rows)
+    
+    @staticmethod
+    def _build_message_responses(rows) -> List[MessageResponse]:
+        # Rows come straight from the database, so skip per-row validation
+        return [
+            MessageResponse.model_construct(
+                id=message_id,
+                conversation_id=conversation_id,
+                role=role,
+                content=content,
+                tokens_used=tokens_used,
+                message_metadata=message_metadata,
+                created_at=created_at
+            )
+            for message_id, conversation_id, role, content, tokens_used, message_metadata, created_at in rows
+        ]
     
     def clear_conversation_history(
         self,
@@ -338,18 +442,10 @@ class ConversationService:
         if success:
             # Clear RAG memory
             try:
-                # Clear memory asynchronously (we'll use sync wrapper)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    loop.run_until_complete(
-                        self.rag_service.clear_memory_async(user_id)
-                    )
-                    print(f"[CONVERSATION_SERVICE] Cleared RAG memory for user {user_id}")
-                finally:
-                    loop.close()
+                self.rag_service.clear_memory_sync(user_id)
+                logger.info("[CONVERSATION_SERVICE] Cleared RAG memory for user {}", user_id)
             except Exception as e:
-                print(f"[WARNING] Failed to clear RAG memory: {e}")
+                logger.warning("[CONVERSATION_SERVICE] Failed to clear RAG memory: {}", e)
         
         return success
     
@@ -11,6 +11,7 @@ from app.services.graph_service import GraphService
 from app.repositories.training_message_repository import TrainingMessageRepository
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.openai_client import get_async_http_client, get_http_client
 
 
 class TrainingState(TypedDict):
@@ -48,7 +49,9 @@ class DigitalHumanTrainingService:
         self.llm = ChatOpenAI(
             api_key=settings.OPENAI_API_KEY,
             model="gpt-4o-mini",
-            temperature=0.3
+            temperature=0.3,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client()
         )
         
         self.training_graph = self._build_training_graph()
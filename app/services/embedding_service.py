@@ -3,6 +3,7 @@ from typing import List
 from langchain_openai import OpenAIEmbeddings
 import openai
 from app.core.logger import logger
+from app.core.openai_client import get_async_http_client, get_http_client
 
 
 class EmbeddingService:
@@ -23,7 +24,9 @@ class EmbeddingService:
             self.embeddings = OpenAIEmbeddings(
                 openai_api_key=self.openai_api_key,
                 model="text-embedding-3-small",  # 默认维度 1536，更好的效果
-                timeout=30
+                timeout=30,
+                http_client=get_http_client(),
+                http_async_client=get_async_http_client()
             )
             
             logger.info("✅ EmbeddingService 初始化完成")
@@ -40,8 +43,8 @@ class EmbeddingService:
     def _validate_openai_api_key(self):
         """验证 OpenAI API 密钥是否有效"""
         try:
-            # 创建临时客户端进行验证
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            # 创建临时客户端进行验证（复用共享连接池）
+            client = openai.OpenAI(api_key=self.openai_api_key, http_client=get_http_client())
             # 尝试获取模型列表来验证密钥
             client.models.list()
             logger.debug("OpenAI API 密钥验证成功")
@@ -5,6 +5,7 @@ from langchain_openai import ChatOpenAI
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.openai_client import get_async_http_client, get_http_client
 from app.models.graph.dynamic_entity import DynamicEntity
 from app.models.graph.dynamic_relationship import DynamicRelationship
 from app.models.graph.dynamic_factory import DynamicGraphFactory
@@ -22,7 +23,9 @@ class KnowledgeExtractor:
         
         self.llm = ChatOpenAI(
             model=settings.LLM_MODEL,
-            temperature=0
+            temperature=0,
+            http_client=get_http_client(),
+            http_async_client=get_async_http_client()
         )
         
         # 基于配置创建文本分割器
@@ -5,6 +5,7 @@ from langchain.schema import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from app.core.checkpointer import PostgresCheckpointer
 from app.core.database import get_db
+from app.core.openai_client import get_async_http_client, get_http_client
 from pydantic import BaseModel
 import json
 import uuid
@@ -38,7 +39,9 @@ class LangGraphService:
                 model="gpt-4o-mini",
                 temperature=0.7,
                 streaming=True,
-                timeout=30
+                timeout=30,
+                http_client=get_http_client(),
+                http_async_client=get_async_http_client()
             )
             
             # 使用 PostgreSQL 检查点保存器，避免双层缓存
@@ -63,7 +66,8 @@ class LangGraphService:
             test_client = ChatOpenAI(
                 api_key=self.openai_api_key,
                 model="gpt-4o-mini",
-                timeout=10
+                timeout=10,
+                http_client=get_http_client()
             )
             
             # 发送简单测试消息验证API密钥
@@ -268,7 +272,8 @@ class LangGraphService:
                 model="gpt-4o-mini",
                 temperature=digital_human_config.get("temperature", 0.7),
                 max_tokens=digital_human_config.get("max_tokens", 2048),
-                streaming=True
+                streaming=True,
+                http_client=get_http_client()
             )
             
             # 流式生成响应
@@ -1,14 +1,45 @@
 """
 Memory services for RAG system
+
+Exports are resolved lazily (PEP 562) to keep ChromaDB/OpenAI off the import path
+until a memory class is first used.
 """
-from .base_memory import BaseMemorySystem, MemoryItem, RetrievalResult
-from .graph_memory import GraphMemorySystem
-from .memory_manager import MemoryManager
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base_memory import BaseMemorySystem, MemoryItem, RetrievalResult
+    from .graph_memory import GraphMemorySystem
+    from .memory_manager import MemoryManager, GraphMemoryManager, make_memory_manager
+
+_LAZY_IMPORTS = {
+    "BaseMemorySystem": ".base_memory",
+    "MemoryItem": ".base_memory",
+    "RetrievalResult": ".base_memory",
+    "GraphMemorySystem": ".graph_memory",
+    "MemoryManager": ".memory_manager",
+    "GraphMemoryManager": ".memory_manager",
+    "make_memory_manager": ".memory_manager",
+}
 
 __all__ = [
     "BaseMemorySystem", 
     "MemoryItem", 
     "RetrievalResult", 
     "GraphMemorySystem", 
-    "MemoryManager"
-]
\ No newline at end of file
+    "MemoryManager",
+    "GraphMemoryManager",
+    "make_memory_manager"
+]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
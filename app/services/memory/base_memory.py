@@ -10,7 +10,6 @@ import os
 from dotenv import load_dotenv
 
 # Core imports
-import openai
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -19,6 +18,11 @@ import chromadb
 from chromadb.config import Settings
 
 from ...core.config import settings
+from ...core.logger import logger
+from ...core.openai_client import get_async_openai_client, get_openai_client
+from .embedding_batcher import AsyncEmbeddingBatcher
+
+EMBEDDING_MODEL = "text-embedding-3-small"
 
 @dataclass
 class MemoryItem:
@@ -48,8 +52,10 @@ class BaseMemorySystem(ABC):
         self.name = name
         self.conversation_count = 0
         
-        # Set up OpenAI client using ai-agents-fork config
-        self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Process-wide OpenAI clients sharing one keep-alive connection pool
+        self.openai_client = get_openai_client()
+        self.async_openai_client = get_async_openai_client()
+        self.embedding_batcher = AsyncEmbeddingBatcher(self.async_openai_client, EMBEDDING_MODEL)
         
         # Set up ChromaDB client using ai-agents-fork config
         self.chroma_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
@@ -66,35 +72,81 @@ class BaseMemorySystem(ABC):
             print(f"[ERROR] Could not initialize ChromaDB: {e}")
             self.collection = None
     
+    @staticmethod
+    def format_memory_content(user_message: str, assistant_response: str) -> str:
+        """Build the document stored in ChromaDB for a conversation turn"""
+        return f"User: {user_message}\nAssistant: {assistant_response}"
+    
     @abstractmethod
-    def store_conversation(self, user_message: str, assistant_response: str, context: Dict[str, Any] = None):
-        """Store a conversation turn"""
+    def store_conversation(
+        self,
+        user_message: str,
+        assistant_response: str,
+        context: Dict[str, Any] = None,
+        memory_embedding: Optional[List[float]] = None
+    ):
+        """Store a conversation turn
+        
+        memory_embedding, when given, is the precomputed embedding of
+        format_memory_content(user_message, assistant_response).
+        """
         pass
     
     @abstractmethod
-    def retrieve_context(self, query: str, max_results: int = 5) -> RetrievalResult:
-        """Retrieve relevant context for a query"""
+    def retrieve_context(
+        self,
+        query: str,
+        max_results: int = 5,
+        query_embedding: Optional[List[float]] = None
+    ) -> RetrievalResult:
+        """Retrieve relevant context for a query, reusing query_embedding when given"""
         pass
     
     @abstractmethod
-    def get_stats(self) -> Dict[str, Any]:
-        """Get memory statistics"""
+    def get_stats(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get memory statistics; refresh=True re-reads counts from the store"""
         pass
     
-    def get_embedding(self, text: str) -> List[float]:
-        """Get OpenAI embedding for text using ai-agents-fork config"""
+    def embed(self, text: str) -> Optional[List[float]]:
+        """Get OpenAI embedding for text, or None when the embeddings API fails
+        
+        Similarity caches must use this rather than get_embedding: fallback vectors
+        of unrelated texts score ~0.97 cosine against each other.
+        """
         try:
             response = self.openai_client.embeddings.create(
                 input=text,
-                model="text-embedding-3-small"
+                model=EMBEDDING_MODEL
             )
             return response.data[0].embedding
         except Exception as e:
-            print(f"[WARNING] Embedding failed: {e}")
-            # Return a simple hash-based embedding as fallback
-            import hashlib
-            hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
-            return [(hash_val >> i) % 1000 / 500.0 - 1.0 for i in range(1536)]
+            logger.warning("[MEMORY] Embedding failed: {}", e)
+            return None
+    
+    async def embed_async(self, text: str) -> Optional[List[float]]:
+        """Async variant of embed, batched with concurrent requests"""
+        try:
+            return await self.embedding_batcher.embed(text)
+        except Exception as e:
+            logger.warning("[MEMORY] Embedding failed: {}", e)
+            return None
+    
+    def get_embedding(self, text: str) -> List[float]:
+        """Get OpenAI embedding for text using ai-agents-fork config (hash fallback on failure)"""
+        embedding = self.embed(text)
+        return embedding if embedding is not None else self._fallback_embedding(text)
+    
+    async def get_embedding_async(self, text: str) -> List[float]:
+        """Get OpenAI embedding asynchronously (hash fallback on failure)"""
+        embedding = await self.embed_async(text)
+        return embedding if embedding is not None else self._fallback_embedding(text)
+    
+    @staticmethod
+    def _fallback_embedding(text: str) -> List[float]:
+        """Simple hash-based embedding used when the embeddings API is unavailable"""
+        import hashlib
+        hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
+        return [(hash_val >> i) % 1000 / 500.0 - 1.0 for i in range(1536)]
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate similarity between two texts"""
@@ -0,0 +1,102 @@
+"""
+Async embedding batcher for the RAG memory system
+Coalesces concurrent embedding requests into batched OpenAI calls
+"""
+import asyncio
+from typing import List, Optional, Set, Tuple
+
+import openai
+
+
+class AsyncEmbeddingBatcher:
+    """Collects embedding requests arriving within a short window and sends them as one call"""
+
+    def __init__(
+        self,
+        client: openai.AsyncOpenAI,
+        model: str,
+        max_batch: int = 64,
+        max_wait: float = 0.01
+    ):
+        self.client = client
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single text, sharing the API call with concurrent requests"""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the collecting task on the current loop if it is not running there"""
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._collect())
+
+    async def _collect(self) -> None:
+        """Drain the queue into batches of up to max_batch items or max_wait seconds"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Flush in the background so the next batch can accumulate meanwhile
+            task = loop.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send one embeddings request for the batch and resolve each caller's future"""
+        try:
+            embeddings = await self._create([text for text, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exception=e)
+                return
+            # One bad input (e.g. over the token limit) fails the whole request;
+            # retry items individually so only the affected callers see an error
+            await asyncio.gather(*(self._flush([item]) for item in batch))
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            self._resolve(future, result=embedding)
+
+    async def _create(self, texts: List[str]) -> List[List[float]]:
+        response = await self.client.embeddings.create(model=self.model, input=texts)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    @staticmethod
+    def _resolve(
+        future: asyncio.Future,
+        result: Optional[List[float]] = None,
+        exception: Optional[BaseException] = None
+    ) -> None:
+        """Complete a caller's future unless the caller already gave up on it"""
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
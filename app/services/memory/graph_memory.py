@@ -5,6 +5,7 @@ Integrated for ai-agents-fork architecture
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from enum import Enum
+import threading
 import time
 import uuid
 
@@ -27,6 +28,7 @@ class ConversationState:
     user_message: str = ""
     assistant_response: str = ""
     query: str = ""
+    query_embedding: Optional[List[float]] = None
     
     # Intent and analysis
     intent: str = "conversational"
@@ -43,6 +45,9 @@ class ConversationState:
     graph_rag_results: List[Dict[str, Any]] = field(default_factory=list)  # Future GraphRAG
     tool_context: str = ""
     
+    # Precomputed embedding of the memory document (storage workflow)
+    memory_embedding: Optional[List[float]] = None
+    
     # Memory results
     retrieved_memories: List[str] = field(default_factory=list)
     memory_context: str = ""
@@ -69,13 +74,24 @@ class GraphMemorySystem(BaseMemorySystem):
             ProcessingStage.COMBINE_RESULTS: self._combine_results_node,
         }
         
-    def store_conversation(self, user_message: str, assistant_response: str, context: Dict[str, Any] = None):
+        # Stored-document count is tracked in process so stats/health probes don't hit Chroma
+        self._stats_lock = threading.Lock()
+        self._stored_documents = self._count_documents()
+        
+    def store_conversation(
+        self,
+        user_message: str,
+        assistant_response: str,
+        context: Dict[str, Any] = None,
+        memory_embedding: Optional[List[float]] = None
+    ):
         """Store conversation using graph workflow"""
         
         # Create conversation state
         state = ConversationState(
             user_message=user_message,
-            assistant_response=assistant_response
+            assistant_response=assistant_response,
+            memory_embedding=memory_embedding
         )
         
         if context:
@@ -85,21 +101,63 @@ class GraphMemorySystem(BaseMemorySystem):
         state = self._execute_storage_workflow(state)
         
         if not state.errors:
-            self.conversation_count += 1
+            with self._stats_lock:
+                self.conversation_count += 1
+                self._stored_documents += 1
             print(f"[GRAPH] Stored conversation {self.conversation_count}")
         else:
             print(f"[ERROR] Storage failed: {state.errors}")
     
-    def retrieve_context(self, query: str, max_results: int = 5) -> RetrievalResult:
+    def retrieve_context(
+        self,
+        query: str,
+        max_results: int = 5,
+        query_embedding: Optional[List[float]] = None
+    ) -> RetrievalResult:
         """Retrieve context using graph workflow"""
         
         # Create retrieval state
-        state = ConversationState(query=query)
+        state = ConversationState(query=query, query_embedding=query_embedding)
         
         # Execute retrieval workflow
         state = self._execute_retrieval_workflow(state)
         
-        # Convert state to RetrievalResult
+        return self.build_retrieval_result(state, max_results)
+    
+    def plan_retrieval(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> ConversationState:
+        """Run the cheap analysis stages (parse, intent, tool evaluation) of retrieval"""
+        state = ConversationState(query=query, query_embedding=query_embedding)
+        
+        for stage in [
+            ProcessingStage.PARSE_INPUT,
+            ProcessingStage.CLASSIFY_INTENT,
+            ProcessingStage.EVALUATE_TOOLS
+        ]:
+            state = self._execute_node(stage, state)
+            if state.errors:
+                break
+        
+        return state
+    
+    def run_web_search(self, state: ConversationState) -> ConversationState:
+        """Tool branch of retrieval; independent of memory lookup"""
+        if state.needs_web_search:
+            state = self._execute_node(ProcessingStage.EXECUTE_TOOLS, state)
+        return state
+    
+    def run_memory_retrieval(self, state: ConversationState) -> ConversationState:
+        """Memory branch of retrieval; independent of web search"""
+        state = self._execute_node(ProcessingStage.RETRIEVE_CONTEXT, state)
+        if not state.errors:
+            state = self._execute_node(ProcessingStage.COMBINE_RESULTS, state)
+        return state
+    
+    def build_retrieval_result(self, state: ConversationState, max_results: int = 5) -> RetrievalResult:
+        """Convert a finished retrieval state to a RetrievalResult"""
         return RetrievalResult(
             memories=state.retrieved_memories[:max_results],
             context=state.retrieved_memories[:3],  # Top 3 for context
@@ -312,10 +370,12 @@ class GraphMemorySystem(BaseMemorySystem):
         
         try:
             # Create memory document
-            memory_content = f"User: {state.user_message}\nAssistant: {state.assistant_response}"
+            memory_content = self.format_memory_content(state.user_message, state.assistant_response)
             
-            # Get embedding
-            embedding = self.get_embedding(memory_content)
+            # Get embedding (reuse a precomputed one when provided)
+            embedding = state.memory_embedding
+            if embedding is None:
+                embedding = self.get_embedding(memory_content)
             
             # Prepare metadata
             metadata = {
@@ -358,8 +418,10 @@ class GraphMemorySystem(BaseMemorySystem):
             return state
         
         try:
-            # Get query embedding
-            query_embedding = self.get_embedding(state.query)
+            # Get query embedding (reuse a precomputed one when provided)
+            query_embedding = state.query_embedding
+            if query_embedding is None:
+                query_embedding = self.get_embedding(state.query)
             
             # Search ChromaDB
             results = self.collection.query(
@@ -413,20 +475,42 @@ class GraphMemorySystem(BaseMemorySystem):
         
         return sources
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get memory system statistics"""
+    def clear(self):
+        """Clear all stored memories and re-sync the in-process counters
+
+        BaseMemorySystem.clear logs and swallows delete failures, so the
+        document counter is recounted from the collection instead of zeroed.
+        """
+        super().clear()
+        doc_count = self._count_documents()
+        with self._stats_lock:
+            self._stored_documents = doc_count
+    
+    def _count_documents(self) -> int:
+        """Count documents in the ChromaDB collection (round-trips to the store)"""
+        if not self.collection:
+            return 0
+        try:
+            return self.collection.count()
+        except Exception:
+            return 0
+    
+    def get_stats(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get memory system statistics
         
-        doc_count = 0
-        if self.collection:
-            try:
-                doc_count = self.collection.count()
-            except:
-                doc_count = 0
+        Counts come from in-process counters; pass refresh=True to re-count the
+        ChromaDB collection.
+        """
+        
+        if refresh:
+            doc_count = self._count_documents()
+            with self._stats_lock:
+                self._stored_documents = doc_count
         
         return {
             "system_name": self.name,
             "conversation_count": self.conversation_count,
-            "stored_documents": doc_count,
+            "stored_documents": self._stored_documents,
             "features": [
                 "LangGraph-inspired workflows",
                 "Conditional tool routing",
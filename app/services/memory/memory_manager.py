@@ -2,23 +2,107 @@
 Memory Manager for RAG system integration with ai-agents-fork
 Provides high-level interface for memory operations
 """
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from typing import Dict, List, Any, Optional
+import asyncio
+import atexit
+import threading
+import time
+
+import numpy as np
+
+from ._kernels import topk_cosine, warm_up as warm_up_kernels
 from .graph_memory import GraphMemorySystem
-from .base_memory import RetrievalResult
+from .base_memory import BaseMemorySystem, RetrievalResult
+from ...core.config import settings
+from ...core.logger import logger
+
+# Dedicated pool for blocking memory I/O (Chroma + OpenAI embeddings), shared by all
+# MemoryManager instances so it does not queue behind the default executor's work
+_MEM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.MEMORY_EXECUTOR_WORKERS,
+    thread_name_prefix="mem"
+)
+atexit.register(_MEM_EXECUTOR.shutdown, wait=False)
+
+@dataclass
+class ContextCacheEntry:
+    """A retrieval result cached for a conversation, keyed by its query embedding"""
+    query_embedding: np.ndarray
+    max_results: int
+    result: RetrievalResult
+    created_at: float
 
 class MemoryManager:
-    """High-level memory management service for ai-agents-fork"""
+    """High-level memory management service for ai-agents-fork
+    
+    Backend-agnostic base; use make_memory_manager() to get the subclass bound to a
+    concrete memory system.
+    """
     
-    def __init__(self, memory_type: str = "graph"):
-        """Initialize memory manager with specified memory system"""
+    __slots__ = (
+        "memory_type",
+        "memory_system",
+        "_embedding_cache",
+        "_context_cache",
+        "_cache_lock"
+    )
+    
+    EMBEDDING_CACHE_SIZE = 1024
+    CONTEXT_CACHE_CONVERSATIONS = 512
+    CONTEXT_CACHE_ENTRIES = 16
+    
+    def __init__(self, memory_system: BaseMemorySystem, memory_type: str):
+        """Initialize memory manager around an already constructed memory system"""
         self.memory_type = memory_type
+        self.memory_system = memory_system
+        
+        # Exact-string query embeddings and per-conversation retrieval results
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._context_cache: "OrderedDict[str, List[ContextCacheEntry]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
-        if memory_type == "graph":
-            self.memory_system = GraphMemorySystem("AI Agents RAG Memory")
-        else:
-            raise ValueError(f"Unknown memory type: {memory_type}")
+        # Load compiled similarity kernels now instead of on the first retrieval
+        warm_up_kernels()
+        
+        logger.info("[MEMORY_MANAGER] Initialized with {} memory system", memory_type)
+    
+    def embed_query(self, text: str) -> Optional[List[float]]:
+        """Get the embedding for a text, reusing it when the exact text was embedded recently
         
-        print(f"[MEMORY_MANAGER] Initialized with {memory_type} memory system")
+        Returns None when the embeddings API fails; failures are not memoized, so
+        the next call retries.
+        """
+        embedding = self._cached_embedding(text)
+        if embedding is None:
+            embedding = self.memory_system.embed(text)
+            if embedding is not None:
+                self._remember_embedding(text, embedding)
+        return embedding
+    
+    async def embed_query_async(self, text: str) -> Optional[List[float]]:
+        """Async variant of embed_query, batched with concurrent embedding requests"""
+        embedding = self._cached_embedding(text)
+        if embedding is None:
+            embedding = await self.memory_system.embed_async(text)
+            if embedding is not None:
+                self._remember_embedding(text, embedding)
+        return embedding
+    
+    def _cached_embedding(self, text: str) -> Optional[List[float]]:
+        with self._cache_lock:
+            embedding = self._embedding_cache.get(text)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(text)
+            return embedding
+    
+    def _remember_embedding(self, text: str, embedding: List[float]) -> None:
+        with self._cache_lock:
+            self._embedding_cache[text] = embedding
+            if len(self._embedding_cache) > self.EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
     
     async def store_conversation_async(
         self,
@@ -38,20 +122,24 @@ class MemoryManager:
             if digital_human_id:
                 context['digital_human_id'] = digital_human_id
             
+            memory_embedding = await self.memory_system.get_embedding_async(
+                self.memory_system.format_memory_content(user_message, assistant_response)
+            )
+            
             # Execute in thread pool to avoid blocking
-            import asyncio
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
-                None,
+                _MEM_EXECUTOR,
                 self.memory_system.store_conversation,
                 user_message,
                 assistant_response,
-                context
+                context,
+                memory_embedding
             )
             
             return True
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Store conversation failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Store conversation failed: {}", e)
             return False
     
     async def retrieve_context_async(
@@ -59,29 +147,25 @@ class MemoryManager:
         query: str,
         max_results: int = 5,
         user_id: Optional[int] = None,
-        digital_human_id: Optional[int] = None
+        digital_human_id: Optional[int] = None,
+        conversation_id: Optional[str] = None
     ) -> RetrievalResult:
         """Retrieve conversation context asynchronously"""
         try:
-            # Execute in thread pool to avoid blocking
-            import asyncio
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self.memory_system.retrieve_context,
-                query,
-                max_results
-            )
+            query_embedding = await self.embed_query_async(query)
             
-            # Add user/digital_human context to metadata
-            if user_id:
-                result.metadata['user_id'] = user_id
-            if digital_human_id:
-                result.metadata['digital_human_id'] = digital_human_id
+            result = None
+            if conversation_id:
+                result = self._lookup_context(conversation_id, query_embedding, max_results)
             
-            return result
+            if result is None:
+                result = await self._retrieve_uncached_async(
+                    query, max_results, query_embedding, conversation_id
+                )
+            
+            return self._annotate(result, user_id, digital_human_id)
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Retrieve context failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Retrieve context failed: {}", e)
             return RetrievalResult()
     
     def store_conversation_sync(
@@ -110,7 +194,7 @@ class MemoryManager:
             
             return True
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Store conversation failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Store conversation failed: {}", e)
             return False
     
     def retrieve_context_sync(
@@ -118,42 +202,174 @@ class MemoryManager:
         query: str,
         max_results: int = 5,
         user_id: Optional[int] = None,
-        digital_human_id: Optional[int] = None
+        digital_human_id: Optional[int] = None,
+        conversation_id: Optional[str] = None
     ) -> RetrievalResult:
         """Retrieve conversation context synchronously"""
         try:
-            result = self.memory_system.retrieve_context(query, max_results)
+            query_embedding = self.embed_query(query)
             
-            # Add user/digital_human context to metadata
-            if user_id:
-                result.metadata['user_id'] = user_id
-            if digital_human_id:
-                result.metadata['digital_human_id'] = digital_human_id
+            result = None
+            if conversation_id:
+                result = self._lookup_context(conversation_id, query_embedding, max_results)
             
-            return result
+            if result is None:
+                result = self._retrieve_uncached(query, max_results, query_embedding, conversation_id)
+            
+            return self._annotate(result, user_id, digital_human_id)
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Retrieve context failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Retrieve context failed: {}", e)
             return RetrievalResult()
     
+    def _retrieve_uncached(
+        self,
+        query: str,
+        max_results: int,
+        query_embedding: Optional[List[float]],
+        conversation_id: Optional[str]
+    ) -> RetrievalResult:
+        """Run the memory system's retrieval workflow and cache the result per conversation"""
+        result = self.memory_system.retrieve_context(
+            query, max_results, query_embedding=query_embedding
+        )
+        if conversation_id:
+            self._store_context(conversation_id, query_embedding, max_results, result)
+        return result
+    
+    async def _retrieve_uncached_async(
+        self,
+        query: str,
+        max_results: int,
+        query_embedding: Optional[List[float]],
+        conversation_id: Optional[str]
+    ) -> RetrievalResult:
+        """Async variant of _retrieve_uncached; runs the workflow on the memory thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _MEM_EXECUTOR,
+            self._retrieve_uncached,
+            query,
+            max_results,
+            query_embedding,
+            conversation_id
+        )
+    
+    @staticmethod
+    def _annotate(
+        result: RetrievalResult,
+        user_id: Optional[int],
+        digital_human_id: Optional[int]
+    ) -> RetrievalResult:
+        """Add user/digital_human context to metadata"""
+        if user_id:
+            result.metadata['user_id'] = user_id
+        if digital_human_id:
+            result.metadata['digital_human_id'] = digital_human_id
+        return result
+    
+    def _lookup_context(
+        self,
+        conversation_id: str,
+        query_embedding: Optional[List[float]],
+        max_results: int
+    ) -> Optional[RetrievalResult]:
+        """Return a recent retrieval of this conversation for a near-identical query"""
+        if query_embedding is None:
+            return None
+        
+        with self._cache_lock:
+            entries = self._context_cache.get(conversation_id)
+            if not entries:
+                return None
+            
+            cutoff = time.time() - settings.RAG_CONTEXT_CACHE_TTL
+            entries[:] = [
+                entry for entry in entries
+                if entry.created_at >= cutoff and entry.max_results == max_results
+            ]
+            if not entries:
+                del self._context_cache[conversation_id]
+                return None
+            
+            indices, scores = topk_cosine(
+                np.vstack([entry.query_embedding for entry in entries]),
+                self._as_vector(query_embedding),
+                1
+            )
+            if scores[0] < settings.RAG_CONTEXT_CACHE_THRESHOLD:
+                return None
+            
+            self._context_cache.move_to_end(conversation_id)
+            cached = entries[int(indices[0])].result
+        
+        return replace(cached, metadata={**cached.metadata, 'context_cache_hit': True})
+    
+    def _store_context(
+        self,
+        conversation_id: str,
+        query_embedding: Optional[List[float]],
+        max_results: int,
+        result: RetrievalResult
+    ) -> None:
+        """Remember a retrieval result for later turns of the same conversation"""
+        # Without a real query embedding the entry could never be matched reliably
+        if query_embedding is None:
+            return
+        
+        entry = ContextCacheEntry(
+            query_embedding=self._as_vector(query_embedding),
+            max_results=max_results,
+            result=replace(result, metadata=dict(result.metadata)),
+            created_at=time.time()
+        )
+        
+        with self._cache_lock:
+            entries = self._context_cache.setdefault(conversation_id, [])
+            entries.append(entry)
+            if len(entries) > self.CONTEXT_CACHE_ENTRIES:
+                del entries[0]
+            self._context_cache.move_to_end(conversation_id)
+            while len(self._context_cache) > self.CONTEXT_CACHE_CONVERSATIONS:
+                self._context_cache.popitem(last=False)
+    
+    def _clear_context_cache(self) -> None:
+        """Forget cached retrievals after the underlying memory changed wholesale"""
+        with self._cache_lock:
+            self._context_cache.clear()
+    
+    @staticmethod
+    def _as_vector(embedding: List[float]) -> np.ndarray:
+        return np.asarray(embedding, dtype=np.float32)
+    
     async def clear_memory_async(self, user_id: Optional[int] = None) -> bool:
         """Clear memory asynchronously"""
         try:
-            import asyncio
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.memory_system.clear)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(_MEM_EXECUTOR, self.memory_system.clear)
+            self._clear_context_cache()
+            return True
+        except Exception as e:
+            logger.warning("[MEMORY_MANAGER] Clear memory failed: {}", e)
+            return False
+    
+    def clear_memory_sync(self, user_id: Optional[int] = None) -> bool:
+        """Clear memory synchronously"""
+        try:
+            self.memory_system.clear()
+            self._clear_context_cache()
             return True
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Clear memory failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Clear memory failed: {}", e)
             return False
     
-    def get_memory_stats(self) -> Dict[str, Any]:
+    def get_memory_stats(self, refresh: bool = False) -> Dict[str, Any]:
         """Get memory system statistics"""
         try:
-            stats = self.memory_system.get_stats()
+            stats = self.memory_system.get_stats(refresh=refresh)
             stats['memory_manager_type'] = self.memory_type
             return stats
         except Exception as e:
-            print(f"[MEMORY_MANAGER] Get stats failed: {e}")
+            logger.warning("[MEMORY_MANAGER] Get stats failed: {}", e)
             return {
                 'error': str(e),
                 'memory_manager_type': self.memory_type
@@ -162,7 +378,7 @@ class MemoryManager:
     def health_check(self) -> Dict[str, Any]:
         """Perform health check on memory system"""
         try:
-            # Test basic functionality
+            # Cached counters only, so frequent probes never query ChromaDB
             test_result = self.memory_system.get_stats()
             
             return {
@@ -178,4 +394,56 @@ class MemoryManager:
                 'status': 'unhealthy',
                 'memory_type': self.memory_type,
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+
+class GraphMemoryManager(MemoryManager):
+    """Memory manager specialized for the LangGraph-inspired memory system"""
+    
+    __slots__ = ()
+    
+    def __init__(self):
+        super().__init__(GraphMemorySystem("AI Agents RAG Memory"), "graph")
+    
+    async def _retrieve_uncached_async(
+        self,
+        query: str,
+        max_results: int,
+        query_embedding: Optional[List[float]],
+        conversation_id: Optional[str]
+    ) -> RetrievalResult:
+        """Run web search and memory lookup concurrently instead of back to back
+        
+        Node failures are recorded in state.errors rather than raised, and executor
+        threads cannot be interrupted, so a cancelled request stops waiting for the
+        branches but does not stop them; they finish in the background.
+        """
+        state = self.memory_system.plan_retrieval(query, query_embedding)
+        
+        loop = asyncio.get_running_loop()
+        
+        async def run_branch(branch):
+            await loop.run_in_executor(_MEM_EXECUTOR, branch, state)
+        
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(run_branch(self.memory_system.run_memory_retrieval))
+            if state.needs_web_search:
+                tg.create_task(run_branch(self.memory_system.run_web_search))
+        
+        result = self.memory_system.build_retrieval_result(state, max_results)
+        if conversation_id:
+            self._store_context(conversation_id, query_embedding, max_results, result)
+        return result
+
+
+MEMORY_MANAGERS = {
+    "graph": GraphMemoryManager,
+}
+
+
+def make_memory_manager(memory_type: str = "graph") -> MemoryManager:
+    """Create the memory manager registered for memory_type"""
+    manager_cls = MEMORY_MANAGERS.get(memory_type)
+    if manager_cls is None:
+        raise ValueError(f"Unknown memory type: {memory_type}")
+    return manager_cls()
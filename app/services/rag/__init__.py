@@ -1,7 +1,30 @@
 """
 RAG (Retrieval-Augmented Generation) services for ai-agents-fork
+
+Exports are resolved lazily (PEP 562) so the RAG stack is only imported on first use.
 """
-from .rag_service import RAGService
-from .conversation_service import ConversationService
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .rag_service import RAGService
+    from .conversation_service import ConversationService
+
+_LAZY_IMPORTS = {
+    "RAGService": ".rag_service",
+    "ConversationService": ".conversation_service",
+}
+
+__all__ = ["RAGService", "ConversationService"]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        value = getattr(import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["RAGService", "ConversationService"]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
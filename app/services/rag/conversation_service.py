@@ -3,13 +3,19 @@ Enhanced Conversation Service for ai-agents-fork
 Integrates RAG capabilities with the existing conversation system
 """
 from typing import Dict, List, Any, Optional, AsyncGenerator
-import asyncio
-import json
-import uuid
-from datetime import datetime
+import secrets
+import time
+from datetime import datetime, timezone
 
 from .rag_service import RAGService, RAGResponse
 from ...core.config import settings
+from ...core.logger import logger
+from ...utils.sse import chunk_frame, event_frame, with_keepalive
+
+
+def _new_conversation_id() -> str:
+    """Opaque id for conversations started without one (22 URL-safe chars)"""
+    return secrets.token_urlsafe(16)
 
 class ConversationService:
     """Enhanced conversation service with RAG capabilities"""
@@ -30,9 +36,7 @@ class ConversationService:
     ) -> Dict[str, Any]:
         """Process a conversation message with RAG enhancement"""
         
-        # Generate conversation ID if not provided
-        if not conversation_id:
-            conversation_id = str(uuid.uuid4())
+        conversation_id = conversation_id or _new_conversation_id()
         
         try:
             if stream:
@@ -88,70 +92,112 @@ class ConversationService:
         
         return response_data
     
-    async def stream_response_async(
+    async def stream_response_dicts(
         self,
         message: str,
         user_id: Optional[int] = None,
         digital_human_id: Optional[int] = None,
         conversation_id: Optional[str] = None,
         system_prompt: Optional[str] = None
-    ) -> AsyncGenerator[str, None]:
-        """Stream response using Server-Sent Events format"""
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream response as structured event dicts (no SSE framing)"""
         
-        if not conversation_id:
-            conversation_id = str(uuid.uuid4())
+        conversation_id = conversation_id or _new_conversation_id()
         
         try:
-            # Get RAG response
-            rag_response = await self.rag_service.chat_async(
-                user_message=message,
-                conversation_id=conversation_id,
-                user_id=user_id,
-                digital_human_id=digital_human_id,
-                system_prompt=system_prompt
+            start_time = time.time()
+            retrieval_result = await self.rag_service.retrieve_context_async(
+                message, conversation_id, user_id, digital_human_id
             )
             
-            # Simulate streaming by yielding chunks
-            response_text = rag_response.response
-            chunk_size = 20  # Characters per chunk
-            
-            # Yield metadata first
-            metadata = {
+            # Sources are known once retrieval finishes, so metadata goes out first
+            yield {
                 "type": "metadata",
                 "conversation_id": conversation_id,
-                "sources": rag_response.sources,
-                "memory_used": rag_response.memory_used,
-                "web_results": rag_response.web_results,
-                "processing_time": rag_response.processing_time
+                "sources": retrieval_result.sources,
+                "memory_used": len(retrieval_result.memories),
+                "web_results": len(retrieval_result.web_results),
+                "processing_time": round(time.time() - start_time, 2)
             }
-            yield f"data: {json.dumps(metadata)}\n\n"
             
-            # Yield response chunks
-            for i in range(0, len(response_text), chunk_size):
-                chunk = response_text[i:i + chunk_size]
-                chunk_data = {
-                    "type": "chunk",
-                    "content": chunk,
-                    "chunk_id": i // chunk_size
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
-                await asyncio.sleep(0.05)  # Small delay to simulate streaming
+            # Forward tokens as OpenAI produces them
+            chunks: List[str] = []
+            generation_error = None
+            try:
+                async for token in self.rag_service.chat_stream_async(
+                    message, retrieval_result, system_prompt
+                ):
+                    yield {
+                        "type": "chunk",
+                        "content": token,
+                        "chunk_id": len(chunks)
+                    }
+                    chunks.append(token)
+            except Exception as e:
+                generation_error = f"OpenAI API call failed: {str(e)}"
+                logger.exception("[CONVERSATION_SERVICE] OpenAI API call failed: {}", e)
+                if not chunks:
+                    fallback = self.rag_service.fallback_response(message, retrieval_result)
+                    yield {
+                        "type": "chunk",
+                        "content": fallback,
+                        "chunk_id": 0
+                    }
+                    chunks.append(fallback)
+            
+            # Persist the turn in the background so the final event isn't delayed
+            self.rag_service.store_conversation_background(
+                message,
+                "".join(chunks),
+                conversation_id,
+                user_id,
+                digital_human_id
+            )
             
             # Yield completion signal
-            completion_data = {
+            yield {
                 "type": "complete",
                 "conversation_id": conversation_id,
-                "total_chunks": (len(response_text) + chunk_size - 1) // chunk_size
+                "total_chunks": len(chunks),
+                "error": generation_error
             }
-            yield f"data: {json.dumps(completion_data)}\n\n"
             
         except Exception as e:
-            error_data = {
+            yield {
                 "type": "error",
                 "error": str(e),
                 "conversation_id": conversation_id
             }
-            yield f"data: {json.dumps(error_data)}\n\n"
+    
+    async def stream_response_async(
+        self,
+        message: str,
+        user_id: Optional[int] = None,
+        digital_human_id: Optional[int] = None,
+        conversation_id: Optional[str] = None,
+        system_prompt: Optional[str] = None
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream response as ready-to-send Server-Sent Events frames (bytes)
+        
+        Comment frames are interleaved while retrieval or generation is silent
+        for longer than SSE_KEEPALIVE_INTERVAL, so idle proxies keep the connection.
+        """
+        
+        async def frames() -> AsyncGenerator[bytes, None]:
+            async for data in self.stream_response_dicts(
+                message,
+                user_id=user_id,
+                digital_human_id=digital_human_id,
+                conversation_id=conversation_id,
+                system_prompt=system_prompt
+            ):
+                if data["type"] == "chunk":
+                    yield chunk_frame(data["content"], data["chunk_id"])
+                else:
+                    yield event_frame(data)
+        
+        async for frame in with_keepalive(frames(), settings.SSE_KEEPALIVE_INTERVAL):
+            yield frame
     
     def _format_response(
         self, 
@@ -166,7 +212,9 @@ class ConversationService:
             "data": {
                 "message": rag_response.response,
                 "conversation_id": rag_response.conversation_id,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": datetime.fromtimestamp(
+                    rag_response.response_time or time.time(), tz=timezone.utc
+                ).isoformat(),
                 "metadata": {
                     "sources": rag_response.sources,
                     "memory_used": rag_response.memory_used,
@@ -272,6 +320,22 @@ class ConversationService:
                 "message": "Memory cleared successfully" if success else "Failed to clear memory",
                 "user_id": user_id
             }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Error clearing memory: {str(e)}",
+                "user_id": user_id
+            }
+    
+    def clear_memory_sync(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Clear conversation memory synchronously"""
+        try:
+            success = self.rag_service.clear_memory_sync(user_id)
+            return {
+                "success": success,
+                "message": "Memory cleared successfully" if success else "Failed to clear memory",
+                "user_id": user_id
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -2,14 +2,87 @@
 Main RAG Service for ai-agents-fork
 Orchestrates memory, search, and generation components
 """
+import asyncio
 import time
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, AsyncGenerator, Set, Tuple
 from dataclasses import dataclass
 
-import openai
-from ..memory.memory_manager import MemoryManager
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+from ..memory.memory_manager import make_memory_manager
+from ..memory.base_memory import RetrievalResult
 from ..search.web_search_service import WebSearchService
+from .semantic_cache import SemanticResponseCache
 from ...core.config import settings
+from ...core.logger import logger
+from ...core.openai_client import get_async_openai_client, get_openai_client, ping_openai
+
+_DEFAULT_SYSTEM_PROMPT = """You are a helpful AI assistant with access to conversation memory and current web information.
+
+Use the provided context to give accurate, helpful responses. If you use information from web search results, mention that you found recent information. If you reference previous conversations, acknowledge the context naturally.
+
+Be conversational, helpful, and accurate. Don't mention technical details about your memory system or processing unless specifically asked."""
+
+_USER_PROMPT_TEMPLATE = """Context:
+{context_text}
+
+User message: {user_message}
+
+Please respond naturally and helpfully based on the context provided."""
+
+
+# Context is trimmed once the prompt leaves less than this for the reply and chat framing
+_PROMPT_HEADROOM_TOKENS = 512
+# Per-request chat-format overhead (role markers, separators) not seen by the tokenizer
+_MESSAGE_OVERHEAD_TOKENS = 64
+
+
+@lru_cache(maxsize=1024)
+def _prompt_cache_key(system_prompt: str) -> str:
+    """OpenAI prompt_cache_key for requests sharing a system prompt prefix"""
+    return f"rag-{SemanticResponseCache.prompt_hash(system_prompt)[:16]}"
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """tiktoken encoding for model, loaded on first use; None when tiktoken is missing
+
+    A failed load (e.g. the BPE download) is cached as None too, so requests
+    fall back to character counts instead of retrying it on the event loop.
+    """
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("Could not load tiktoken encoding for {}: {}", model, e)
+        return None
+
+
+def warm_up_tokenizer(model: str = settings.LLM_MODEL) -> bool:
+    """Load the tiktoken encoding ahead of the first request
+
+    The first load reads (and may download) the BPE file; run this off the
+    event loop at startup so _completion_params never pays for it inline.
+    """
+    return _get_encoding(model) is not None
+
+
+def _count_tokens(text: str, model: str) -> int:
+    """Token count of text; falls back to the character count, an upper bound for most text"""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text)
+    # User text may contain special-token strings; count them as plain text
+    return len(encoding.encode(text, disallowed_special=()))
 
 @dataclass
 class RAGResponse:
@@ -23,6 +96,7 @@ class RAGResponse:
     metadata: Dict[str, Any]
     conversation_id: Optional[str] = None
     error: Optional[str] = None
+    response_time: Optional[float] = None  # Unix time the response was produced
 
 class RAGService:
     """Main RAG orchestration service for ai-agents-fork"""
@@ -31,17 +105,34 @@ class RAGService:
         """Initialize RAG service with memory and search components"""
         try:
             # Initialize components
-            self.memory_manager = MemoryManager("graph")
+            self.memory_manager = make_memory_manager(settings.RAG_MEMORY_TYPE)
             self.search_service = WebSearchService()
             
-            # Set up OpenAI client
-            self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+            # Set up OpenAI clients (shared connection pool)
+            self.openai_client = get_openai_client()
+            self.async_openai_client = get_async_openai_client()
             self.model = settings.LLM_MODEL
             
-            print("[RAG_SERVICE] Initialized with graph memory and web search")
+            # Last OpenAI probe result, reused by health_check for OPENAI_HEALTH_CHECK_INTERVAL
+            self._openai_ok = False
+            self._last_openai_check = float("-inf")
+            
+            # (monotonic time, payload) of the last get_stats call
+            self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+            
+            # Strong references to fire-and-forget tasks (memory writes after streaming)
+            self._background_tasks: Set[asyncio.Task] = set()
+            
+            # Semantic cache for near-duplicate questions
+            self.response_cache = SemanticResponseCache(
+                self.memory_manager.embed_query,
+                self.memory_manager.embed_query_async
+            )
+            
+            logger.info("[RAG_SERVICE] Initialized with graph memory and web search")
             
         except Exception as e:
-            print(f"[ERROR] Failed to initialize RAG service: {e}")
+            logger.exception("[RAG_SERVICE] Failed to initialize RAG service: {}", e)
             raise
     
     async def chat_async(
@@ -50,31 +141,60 @@ class RAGService:
         conversation_id: Optional[str] = None,
         user_id: Optional[int] = None,
         digital_human_id: Optional[int] = None,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        use_cache: bool = True
     ) -> RAGResponse:
         """Process a chat message asynchronously with RAG enhancement"""
         
         start_time = time.time()
+        use_cache = use_cache and settings.SEMANTIC_CACHE_ENABLED
         
         try:
+            # Step 0: Near-duplicate questions skip retrieval and generation entirely
+            if use_cache:
+                cached_response = await self.response_cache.lookup_async(
+                    user_id, digital_human_id, conversation_id, user_message, system_prompt
+                )
+                if cached_response is not None:
+                    end_time = time.time()
+                    return RAGResponse(
+                        response=cached_response,
+                        sources=[],
+                        memory_used=0,
+                        web_results=0,
+                        facts_retrieved=0,
+                        processing_time=round(end_time - start_time, 2),
+                        metadata={'semantic_cache_hit': True},
+                        conversation_id=conversation_id,
+                        response_time=end_time
+                    )
+            
             # Step 1: Retrieve context using memory system
-            print(f"[RAG_SERVICE] Retrieving context for: {user_message[:50]}...")
-            retrieval_result = await self.memory_manager.retrieve_context_async(
-                user_message, 
-                max_results=5,
-                user_id=user_id,
-                digital_human_id=digital_human_id
+            retrieval_result = await self.retrieve_context_async(
+                user_message, conversation_id, user_id, digital_human_id
             )
             
             # Step 2: Generate response using OpenAI with context
-            response_text = await self._generate_response_async(
-                user_message, 
-                retrieval_result,
-                system_prompt
-            )
+            generation_error = None
+            try:
+                response_text = await self._generate_response_async(
+                    user_message, 
+                    retrieval_result,
+                    system_prompt
+                )
+            except Exception as e:
+                generation_error = f"OpenAI API call failed: {str(e)}"
+                logger.exception("[RAG_SERVICE] OpenAI API call failed: {}", e)
+                response_text = self.fallback_response(user_message, retrieval_result)
             
-            # Step 3: Store the conversation using memory system
-            await self.memory_manager.store_conversation_async(
+            if use_cache and not generation_error:
+                await self.response_cache.store_async(
+                    user_id, digital_human_id, conversation_id, user_message, response_text,
+                    system_prompt
+                )
+            
+            # Step 3: Store the conversation in the background; the reply doesn't depend on it
+            self.store_conversation_background(
                 user_message,
                 response_text,
                 conversation_id,
@@ -82,7 +202,8 @@ class RAGService:
                 digital_human_id
             )
             
-            processing_time = time.time() - start_time
+            end_time = time.time()
+            processing_time = end_time - start_time
             
             return RAGResponse(
                 response=response_text,
@@ -92,13 +213,16 @@ class RAGService:
                 facts_retrieved=len(retrieval_result.facts),
                 processing_time=round(processing_time, 2),
                 metadata=retrieval_result.metadata,
-                conversation_id=conversation_id
+                conversation_id=conversation_id,
+                error=generation_error,
+                response_time=end_time
             )
             
         except Exception as e:
-            processing_time = time.time() - start_time
+            end_time = time.time()
+            processing_time = end_time - start_time
             error_msg = f"RAG processing failed: {str(e)}"
-            print(f"[ERROR] {error_msg}")
+            logger.exception("[RAG_SERVICE] RAG processing failed: {}", e)
             
             return RAGResponse(
                 response="I apologize, but I encountered an error processing your message. Please try again.",
@@ -109,8 +233,97 @@ class RAGService:
                 processing_time=processing_time,
                 metadata={},
                 conversation_id=conversation_id,
-                error=error_msg
+                error=error_msg,
+                response_time=end_time
+            )
+    
+    async def retrieve_context_async(
+        self,
+        user_message: str,
+        conversation_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        digital_human_id: Optional[int] = None
+    ) -> RetrievalResult:
+        """Retrieve memory and web context for a message"""
+        logger.debug("[RAG_SERVICE] Retrieving context for: {:.50}...", user_message)
+        return await self.memory_manager.retrieve_context_async(
+            user_message, 
+            max_results=5,
+            user_id=user_id,
+            digital_human_id=digital_human_id,
+            conversation_id=conversation_id
+        )
+    
+    async def chat_stream_async(
+        self,
+        user_message: str,
+        retrieval_result: RetrievalResult,
+        system_prompt: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """Stream response tokens from OpenAI as they are generated (raises on API failure)
+        
+        The whole generation shares one RAG_GENERATION_TIMEOUT deadline, so a stalled
+        upstream raises TimeoutError instead of holding the connection open. The
+        deadline only wraps awaits on OpenAI, never a yield to the consumer.
+        """
+        deadline = asyncio.get_running_loop().time() + settings.RAG_GENERATION_TIMEOUT
+        async with asyncio.timeout_at(deadline):
+            stream = await self.async_openai_client.chat.completions.create(
+                **self._completion_params(user_message, retrieval_result, system_prompt),
+                stream=True
+            )
+        async with stream:
+            chunks = stream.__aiter__()
+            while True:
+                async with asyncio.timeout_at(deadline):
+                    chunk = await anext(chunks, None)
+                if chunk is None:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    def store_conversation_background(
+        self,
+        user_message: str,
+        response_text: str,
+        conversation_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        digital_human_id: Optional[int] = None
+    ) -> None:
+        """Store a finished turn without making the caller wait for the memory write"""
+        task = asyncio.get_running_loop().create_task(
+            self._safe_store(
+                user_message,
+                response_text,
+                conversation_id,
+                user_id,
+                digital_human_id
+            )
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _safe_store(
+        self,
+        user_message: str,
+        response_text: str,
+        conversation_id: Optional[str],
+        user_id: Optional[int],
+        digital_human_id: Optional[int]
+    ) -> None:
+        """Background memory write; failures are reported here since nobody awaits the task"""
+        try:
+            stored = await self.memory_manager.store_conversation_async(
+                user_message,
+                response_text,
+                conversation_id,
+                user_id,
+                digital_human_id
             )
+            if not stored:
+                logger.warning("[RAG_SERVICE] Background memory store failed for conversation {}", conversation_id)
+        except Exception as e:
+            logger.exception("[RAG_SERVICE] Background memory store failed: {}", e)
     
     def chat_sync(
         self,
@@ -126,20 +339,27 @@ class RAGService:
         
         try:
             # Step 1: Retrieve context using memory system
-            print(f"[RAG_SERVICE] Retrieving context for: {user_message[:50]}...")
+            logger.debug("[RAG_SERVICE] Retrieving context for: {:.50}...", user_message)
             retrieval_result = self.memory_manager.retrieve_context_sync(
                 user_message, 
                 max_results=5,
                 user_id=user_id,
-                digital_human_id=digital_human_id
+                digital_human_id=digital_human_id,
+                conversation_id=conversation_id
             )
             
             # Step 2: Generate response using OpenAI with context
-            response_text = self._generate_response_sync(
-                user_message, 
-                retrieval_result,
-                system_prompt
-            )
+            generation_error = None
+            try:
+                response_text = self._generate_response_sync(
+                    user_message, 
+                    retrieval_result,
+                    system_prompt
+                )
+            except Exception as e:
+                generation_error = f"OpenAI API call failed: {str(e)}"
+                logger.exception("[RAG_SERVICE] OpenAI API call failed: {}", e)
+                response_text = self.fallback_response(user_message, retrieval_result)
             
             # Step 3: Store the conversation using memory system
             self.memory_manager.store_conversation_sync(
@@ -150,7 +370,8 @@ class RAGService:
                 digital_human_id
             )
             
-            processing_time = time.time() - start_time
+            end_time = time.time()
+            processing_time = end_time - start_time
             
             return RAGResponse(
                 response=response_text,
@@ -160,13 +381,16 @@ class RAGService:
                 facts_retrieved=len(retrieval_result.facts),
                 processing_time=round(processing_time, 2),
                 metadata=retrieval_result.metadata,
-                conversation_id=conversation_id
+                conversation_id=conversation_id,
+                error=generation_error,
+                response_time=end_time
             )
             
         except Exception as e:
-            processing_time = time.time() - start_time
+            end_time = time.time()
+            processing_time = end_time - start_time
             error_msg = f"RAG processing failed: {str(e)}"
-            print(f"[ERROR] {error_msg}")
+            logger.exception("[RAG_SERVICE] RAG processing failed: {}", e)
             
             return RAGResponse(
                 response="I apologize, but I encountered an error processing your message. Please try again.",
@@ -177,7 +401,8 @@ class RAGService:
                 processing_time=processing_time,
                 metadata={},
                 conversation_id=conversation_id,
-                error=error_msg
+                error=error_msg,
+                response_time=end_time
             )
     
     async def _generate_response_async(
@@ -186,16 +411,13 @@ class RAGService:
         retrieval_result,
         system_prompt: Optional[str] = None
     ) -> str:
-        """Generate response asynchronously using OpenAI with retrieved context"""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self._generate_response_sync,
-            user_message,
-            retrieval_result,
-            system_prompt
-        )
+        """Generate response asynchronously using OpenAI with retrieved context (raises on API failure)"""
+        async with asyncio.timeout(settings.RAG_GENERATION_TIMEOUT):
+            response = await self.async_openai_client.chat.completions.create(
+                **self._completion_params(user_message, retrieval_result, system_prompt)
+            )
+        
+        return response.choices[0].message.content.strip()
     
     def _generate_response_sync(
         self, 
@@ -203,81 +425,126 @@ class RAGService:
         retrieval_result,
         system_prompt: Optional[str] = None
     ) -> str:
-        """Generate response using OpenAI with retrieved context"""
-        
-        # Build context from memory and web search
-        context_parts = []
-        
-        # Add memory context
-        if retrieval_result.memories:
-            context_parts.append("Previous conversation context:")
-            for i, memory in enumerate(retrieval_result.memories[:3], 1):
-                context_parts.append(f"{i}. {memory}")
-        
-        # Add facts
-        if retrieval_result.facts:
-            context_parts.append("\nKnown facts about the user:")
-            for key, value in retrieval_result.facts.items():
-                if not key.startswith('_'):  # Skip internal metadata
-                    context_parts.append(f"- {key}: {value}")
-        
-        # Add web search results
-        if retrieval_result.web_results:
-            context_parts.append("\nRecent information from web search:")
-            for i, result in enumerate(retrieval_result.web_results[:3], 1):
-                title = result.get('title', 'No title')
-                snippet = result.get('snippet', 'No description')
-                context_parts.append(f"{i}. {title}: {snippet}")
-        
-        # Build the prompt
-        default_system_prompt = """You are a helpful AI assistant with access to conversation memory and current web information.
-
-Use the provided context to give accurate, helpful responses. If you use information from web search results, mention that you found recent information. If you reference previous conversations, acknowledge the context naturally.
-
-Be conversational, helpful, and accurate. Don't mention technical details about your memory system or processing unless specifically asked."""
-        
-        final_system_prompt = system_prompt or default_system_prompt
+        """Generate response using OpenAI with retrieved context (raises on API failure)"""
+        response = self.openai_client.chat.completions.create(
+            **self._completion_params(user_message, retrieval_result, system_prompt)
+        )
         
-        context_text = "\n".join(context_parts) if context_parts else "No additional context available."
+        return response.choices[0].message.content.strip()
+    
+    def _completion_params(
+        self,
+        user_message: str,
+        retrieval_result,
+        system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments shared by the sync, async and streaming paths"""
+        messages, prompt_tokens = self._build_messages(user_message, retrieval_result, system_prompt)
+        params = {
+            "model": self.model,
+            "messages": messages,
+            # Long prompts leave less room in the context window for the reply
+            "max_tokens": max(1, min(
+                settings.LLM_MAX_OUTPUT_TOKENS,
+                settings.LLM_CONTEXT_WINDOW - prompt_tokens - _MESSAGE_OVERHEAD_TOKENS
+            )),
+            "temperature": 0.7
+        }
+        if settings.OPENAI_PROMPT_CACHE_KEY_ENABLED:
+            # The system prompt is the stable prefix; route requests sharing it together
+            params["extra_body"] = {
+                "prompt_cache_key": _prompt_cache_key(system_prompt or _DEFAULT_SYSTEM_PROMPT)
+            }
+        return params
+    
+    def _build_messages(
+        self,
+        user_message: str,
+        retrieval_result,
+        system_prompt: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the chat messages from retrieved context (shared by all generation paths)
         
-        user_prompt = f"""Context:\n{context_text}\n\nUser message: {user_message}
-
-Please respond naturally and helpfully based on the context provided."""
+        Returns the messages and their token count. When the prompt would not leave
+        _PROMPT_HEADROOM_TOKENS of the context window free, the lowest-ranked web
+        results and then memories are dropped until it does.
+        """
+        system_content = system_prompt or _DEFAULT_SYSTEM_PROMPT
+        memories = retrieval_result.memories[:3]
+        web_results = retrieval_result.web_results[:3]
+        fact_block = "\n".join(
+            f"- {key}: {value}" for key, value in retrieval_result.facts.items()
+            if not key.startswith('_')  # Skip internal metadata
+        )
         
-        try:
-            # Generate response using OpenAI
-            response = self.openai_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": final_system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
+        token_budget = settings.LLM_CONTEXT_WINDOW - _PROMPT_HEADROOM_TOKENS
+        system_tokens = _count_tokens(system_content, self.model)
+        while True:
+            user_content = _USER_PROMPT_TEMPLATE.format(
+                context_text=self._format_context(memories, fact_block, web_results),
+                user_message=user_message
             )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            print(f"[ERROR] OpenAI API call failed: {e}")
-            
-            # Fallback response
-            if retrieval_result.memories:
-                return f"Based on our previous conversations, I understand you're asking about: {user_message}. However, I'm having trouble accessing my language model right now. Could you please try again?"
+            prompt_tokens = system_tokens + _count_tokens(user_content, self.model)
+            if prompt_tokens <= token_budget or not (memories or web_results):
+                break
+            if web_results:
+                web_results = web_results[:-1]
             else:
-                return f"I understand you're asking about: {user_message}. I'm experiencing some technical difficulties with my response generation. Please try again in a moment."
+                memories = memories[:-1]
+        
+        return [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": user_content}
+        ], prompt_tokens
+    
+    @staticmethod
+    def _format_context(
+        memories: List[str],
+        fact_block: str,
+        web_results: List[Dict[str, Any]]
+    ) -> str:
+        """Join the context sections; empty sections are left out"""
+        memory_block = "\n".join(
+            f"{i}. {memory}" for i, memory in enumerate(memories, 1)
+        )
+        web_block = "\n".join(
+            f"{i}. {result.get('title', 'No title')}: {result.get('snippet', 'No description')}"
+            for i, result in enumerate(web_results, 1)
+        )
+        
+        return "\n\n".join(
+            section for section in (
+                memory_block and f"Previous conversation context:\n{memory_block}",
+                fact_block and f"Known facts about the user:\n{fact_block}",
+                web_block and f"Recent information from web search:\n{web_block}"
+            ) if section
+        ) or "No additional context available."
+    
+    def fallback_response(self, user_message: str, retrieval_result) -> str:
+        """Fallback response used when the language model is unavailable"""
+        if retrieval_result.memories:
+            return f"Based on our previous conversations, I understand you're asking about: {user_message}. However, I'm having trouble accessing my language model right now. Could you please try again?"
+        else:
+            return f"I understand you're asking about: {user_message}. I'm experiencing some technical difficulties with my response generation. Please try again in a moment."
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get RAG service statistics"""
+    def get_stats(self, refresh: bool = False) -> Dict[str, Any]:
+        """Get RAG service statistics, reused for RAG_STATS_CACHE_TTL seconds unless refresh"""
+        now = time.monotonic()
+        if not refresh and self._stats_cache is not None:
+            cached_at, payload = self._stats_cache
+            if now - cached_at < settings.RAG_STATS_CACHE_TTL:
+                return payload
+        
         try:
-            memory_stats = self.memory_manager.get_memory_stats()
+            memory_stats = self.memory_manager.get_memory_stats(refresh=refresh)
             search_stats = self.search_service.get_search_stats()
             
-            return {
+            payload = {
                 'service_name': 'RAG Service',
                 'model': self.model,
                 'memory_system': memory_stats,
                 'search_service': search_stats,
+                'semantic_cache': self.response_cache.get_stats(),
                 'capabilities': [
                     'Natural conversation',
                     'Memory of past conversations',
@@ -289,6 +556,8 @@ Please respond naturally and helpfully based on the context provided."""
                     'GraphRAG ready'
                 ]
             }
+            self._stats_cache = (now, payload)
+            return payload
         except Exception as e:
             return {
                 'error': str(e),
@@ -303,16 +572,7 @@ Please respond naturally and helpfully based on the context provided."""
             search_health = self.search_service.health_check()
             
             # Test OpenAI connection
-            openai_healthy = True
-            try:
-                test_response = self.openai_client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": "test"}],
-                    max_tokens=1
-                )
-                openai_healthy = True
-            except:
-                openai_healthy = False
+            openai_healthy = self._check_openai()
             
             overall_status = 'healthy'
             if memory_health['status'] != 'healthy' or search_health['status'] == 'unhealthy' or not openai_healthy:
@@ -337,15 +597,20 @@ Please respond naturally and helpfully based on the context provided."""
                 'error': str(e)
             }
     
+    def _check_openai(self) -> bool:
+        """Probe OpenAI model metadata, at most once per OPENAI_HEALTH_CHECK_INTERVAL"""
+        now = time.monotonic()
+        if now - self._last_openai_check >= settings.OPENAI_HEALTH_CHECK_INTERVAL:
+            self._openai_ok = ping_openai(self.model)
+            self._last_openai_check = now
+        return self._openai_ok
+    
     async def clear_memory_async(self, user_id: Optional[int] = None) -> bool:
         """Clear memory asynchronously"""
+        self.response_cache.clear(user_id)
         return await self.memory_manager.clear_memory_async(user_id)
     
     def clear_memory_sync(self, user_id: Optional[int] = None) -> bool:
         """Clear memory synchronously"""
-        try:
-            self.memory_manager.memory_system.clear()
-            return True
-        except Exception as e:
-            print(f"[ERROR] Clear memory failed: {e}")
-            return False
\ No newline at end of file
+        self.response_cache.clear(user_id)
+        return self.memory_manager.clear_memory_sync(user_id)
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Semantic response cache for the RAG pipeline
+Short-circuits near-duplicate questions before memory retrieval and generation
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from ..memory._kernels import topk_cosine
+from ...core.config import settings
+
+Namespace = Tuple[Optional[int], Optional[int], Optional[str], str]
+
+
+@dataclass
+class CacheEntry:
+    """A cached response and the embedding of the message that produced it"""
+    embedding: np.ndarray
+    response: str
+    created_at: float
+
+
+class SemanticResponseCache:
+    """In-process, embedding-keyed cache of RAG responses
+
+    Entries are namespaced by (user_id, digital_human_id, conversation_id,
+    system_prompt_hash) so a cached answer is only reused within the same
+    conversation with the same persona: context-dependent turns such as
+    "tell me more" or "why?" embed identically across conversations.
+    The embedders return None when embedding fails; such messages are neither
+    looked up nor stored, since substitute vectors would match unrelated text.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Optional[List[float]]],
+        embed_async: Optional[Callable[[str], Awaitable[Optional[List[float]]]]] = None,
+        similarity_threshold: float = settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: float = settings.SEMANTIC_CACHE_TTL,
+        max_entries_per_namespace: int = 256,
+        max_namespaces: int = 1024
+    ):
+        self.embed = embed
+        self.embed_async = embed_async
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self.max_namespaces = max_namespaces
+
+        self._namespaces: "OrderedDict[Namespace, List[CacheEntry]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def prompt_hash(system_prompt: Optional[str]) -> str:
+        """Stable hash of the system prompt used in cache namespaces"""
+        return hashlib.sha1((system_prompt or "").encode("utf-8")).hexdigest()
+
+    def _namespace(
+        self,
+        user_id: Optional[int],
+        digital_human_id: Optional[int],
+        conversation_id: Optional[str],
+        system_prompt: Optional[str],
+        system_prompt_hash: Optional[str]
+    ) -> Namespace:
+        """Cache namespace; callers holding a precomputed prompt hash skip re-hashing"""
+        if system_prompt_hash is None:
+            system_prompt_hash = self.prompt_hash(system_prompt)
+        return (user_id, digital_human_id, conversation_id, system_prompt_hash)
+
+    def lookup(
+        self,
+        user_id: Optional[int],
+        digital_human_id: Optional[int],
+        conversation_id: Optional[str],
+        message: str,
+        system_prompt: Optional[str] = None,
+        system_prompt_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """Return a cached response for a semantically equivalent message, if any"""
+        namespace = self._namespace(
+            user_id, digital_human_id, conversation_id, system_prompt, system_prompt_hash
+        )
+        if not self._has_entries(namespace):
+            return None
+        return self._best_match(namespace, self.embed(message))
+
+    def store(
+        self,
+        user_id: Optional[int],
+        digital_human_id: Optional[int],
+        conversation_id: Optional[str],
+        message: str,
+        response: str,
+        system_prompt: Optional[str] = None,
+        system_prompt_hash: Optional[str] = None
+    ) -> None:
+        """Cache a response for the given message"""
+        namespace = self._namespace(
+            user_id, digital_human_id, conversation_id, system_prompt, system_prompt_hash
+        )
+        self._add(namespace, self.embed(message), response)
+
+    async def lookup_async(
+        self,
+        user_id: Optional[int],
+        digital_human_id: Optional[int],
+        conversation_id: Optional[str],
+        message: str,
+        system_prompt: Optional[str] = None,
+        system_prompt_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """Lookup without blocking the event loop on the embedding call"""
+        if self.embed_async is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self.lookup, user_id, digital_human_id, conversation_id, message,
+                system_prompt, system_prompt_hash
+            )
+
+        namespace = self._namespace(
+            user_id, digital_human_id, conversation_id, system_prompt, system_prompt_hash
+        )
+        if not self._has_entries(namespace):
+            return None
+        return self._best_match(namespace, await self.embed_async(message))
+
+    async def store_async(
+        self,
+        user_id: Optional[int],
+        digital_human_id: Optional[int],
+        conversation_id: Optional[str],
+        message: str,
+        response: str,
+        system_prompt: Optional[str] = None,
+        system_prompt_hash: Optional[str] = None
+    ) -> None:
+        """Store without blocking the event loop on the embedding call"""
+        if self.embed_async is None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self.store, user_id, digital_human_id, conversation_id, message, response,
+                system_prompt, system_prompt_hash
+            )
+            return
+
+        namespace = self._namespace(
+            user_id, digital_human_id, conversation_id, system_prompt, system_prompt_hash
+        )
+        self._add(namespace, await self.embed_async(message), response)
+
+    def clear(self, user_id: Optional[int] = None) -> None:
+        """Drop cached responses for one user, or everything when user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._namespaces.clear()
+                return
+            for namespace in [ns for ns in self._namespaces if ns[0] == user_id]:
+                del self._namespaces[namespace]
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                "namespaces": len(self._namespaces),
+                "entries": sum(len(entries) for entries in self._namespaces.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "similarity_threshold": self.similarity_threshold,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+    def _live_entries(self, namespace: Namespace) -> List[CacheEntry]:
+        """Expire stale entries of a namespace and return the remaining ones (lock held)"""
+        entries = self._namespaces.get(namespace)
+        if not entries:
+            return []
+
+        cutoff = time.time() - self.ttl_seconds
+        if entries[0].created_at < cutoff:
+            entries[:] = [entry for entry in entries if entry.created_at >= cutoff]
+            if not entries:
+                del self._namespaces[namespace]
+        return entries
+
+    def _has_entries(self, namespace: Namespace) -> bool:
+        """Check for live entries so cold namespaces skip the embedding call"""
+        with self._lock:
+            if self._live_entries(namespace):
+                return True
+            self.misses += 1
+            return False
+
+    def _best_match(self, namespace: Namespace, embedding: Optional[List[float]]) -> Optional[str]:
+        """Return the most similar cached response above the threshold"""
+        with self._lock:
+            entries = self._live_entries(namespace) if embedding is not None else None
+            if entries:
+                indices, scores = topk_cosine(
+                    np.vstack([entry.embedding for entry in entries]),
+                    self._as_vector(embedding),
+                    1
+                )
+                if scores[0] >= self.similarity_threshold:
+                    self._namespaces.move_to_end(namespace)
+                    self.hits += 1
+                    return entries[int(indices[0])].response
+            self.misses += 1
+            return None
+
+    def _add(self, namespace: Namespace, embedding: Optional[List[float]], response: str) -> None:
+        if embedding is None:
+            return
+        entry = CacheEntry(
+            embedding=self._as_vector(embedding), response=response, created_at=time.time()
+        )
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, [])
+            entries.append(entry)
+            if len(entries) > self.max_entries_per_namespace:
+                del entries[0]
+            self._namespaces.move_to_end(namespace)
+            while len(self._namespaces) > self.max_namespaces:
+                self._namespaces.popitem(last=False)
+
+    @staticmethod
+    def _as_vector(embedding: List[float]) -> np.ndarray:
+        return np.asarray(embedding, dtype=np.float32)
@@ -343,7 +343,7 @@ class WebSearchService:
     async def search_async(self, query: str, max_results: int = 5, provider: str = None) -> List[Dict[str, Any]]:
         """Search asynchronously using specified provider or auto-fallback"""
         import asyncio
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, self.search, query, max_results, provider)
     
     def search(self, query: str, max_results: int = 5, provider: str = None) -> List[Dict[str, Any]]:
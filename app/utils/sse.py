@@ -0,0 +1,68 @@
+"""
+Server-Sent Events 工具
+"""
+import asyncio
+from contextlib import suppress
+from typing import Any, AsyncIterator, Dict, TypeVar
+
+import orjson
+
+Frame = TypeVar("Frame", str, bytes)
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+# RAG 元数据中可能出现 numpy 标量和非字符串键
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+# 文本帧占流的绝大部分，只有内容（和序号）需要逐帧序列化
+_CHUNK_FRAME_PREFIX = b'data: {"type":"chunk","content":'
+_TOKEN_FRAME_PREFIX = b'data: {"type":"token","content":'
+
+
+def event_frame(payload: Dict[str, Any]) -> bytes:
+    """把事件字典编码为完整的 SSE 帧（bytes，可直接交给 StreamingResponse）"""
+    return b"data: " + orjson.dumps(payload, option=_ORJSON_OPTIONS) + b"\n\n"
+
+
+def chunk_frame(content: str, chunk_id: int) -> bytes:
+    """RAG 流的文本块帧：{"type":"chunk","content":...,"chunk_id":...}"""
+    return _CHUNK_FRAME_PREFIX + orjson.dumps(content) + b',"chunk_id":' + str(chunk_id).encode() + b"}\n\n"
+
+
+def token_frame(content: str) -> bytes:
+    """对话流的 token 帧：{"type":"token","content":...}"""
+    return _TOKEN_FRAME_PREFIX + orjson.dumps(content) + b"}\n\n"
+
+
+async def with_keepalive(
+    frames: AsyncIterator[Frame],
+    interval: float,
+    keepalive_frame: Frame = KEEPALIVE_FRAME
+) -> AsyncIterator[Frame]:
+    """
+    转发 SSE 帧；上游超过 interval 秒没有产出时插入注释帧保持连接
+    
+    注释帧（以冒号开头）会被 EventSource 客户端忽略，只用于防止代理/负载均衡器因空闲断开连接，
+    不会拖慢真实帧的发送
+    """
+    iterator = frames.__aiter__()
+    next_frame = asyncio.ensure_future(iterator.__anext__())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_frame}, timeout=interval)
+            if not done:
+                yield keepalive_frame
+                continue
+            
+            try:
+                frame = next_frame.result()
+            except StopAsyncIteration:
+                return
+            yield frame
+            next_frame = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        if not next_frame.done():
+            next_frame.cancel()
+            with suppress(asyncio.CancelledError, StopAsyncIteration):
+                await next_frame
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
@@ -9,6 +9,7 @@ PyCharm 开发环境启动脚本
 
 import uvicorn
 import os
+import sys
 import argparse
 
 def parse_args():
@@ -64,6 +65,7 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
+        loop="auto" if sys.platform == "win32" else "uvloop",  # uvloop 不支持 Windows
         log_level="info",  # 改为info级别，与应用配置一致
         access_log=True  # 显示访问日志
     ) 
\ No newline at end of file
@@ -199,9 +199,9 @@ start_app() {
     conda activate "$CONDA_ENV_NAME"
     # 根据 RELOAD 变量决定是否添加 --reload 参数
     if [ "$RELOAD" = "true" ]; then
-        nohup uvicorn app.main:app --host "$HOST" --port "$PORT" --reload --log-level info > "$LOG_FILE" 2>&1 &
+        nohup uvicorn app.main:app --host "$HOST" --port "$PORT" --reload --loop uvloop --log-level info > "$LOG_FILE" 2>&1 &
     else
-        nohup uvicorn app.main:app --host "$HOST" --port "$PORT" --log-level info > "$LOG_FILE" 2>&1 &
+        nohup uvicorn app.main:app --host "$HOST" --port "$PORT" --loop uvloop --log-level info > "$LOG_FILE" 2>&1 &
     fi
     APP_PID=$!
     
@@ -391,7 +391,7 @@ dev_start() {
     conda activate "$CONDA_ENV_NAME"
     log_success "开发模式启动，热重载已开启"
     log_info "API文档地址: http://$HOST:$PORT/docs"
-    uvicorn app.main:app --host "$HOST" --port "$PORT" --reload --log-level info
+    uvicorn app.main:app --host "$HOST" --port "$PORT" --reload --loop uvloop --log-level info
 }
 
 # 清理函数
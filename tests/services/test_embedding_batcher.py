@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.memory.embedding_batcher import AsyncEmbeddingBatcher
+
+
+class FakeEmbeddingsAPI:
+    """模拟 client.embeddings：按文本长度返回向量，包含 "bad" 的请求整体失败"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, input):
+        self.calls.append(list(input))
+        if any("bad" in text for text in input):
+            raise ValueError("input too long")
+        # 故意倒序返回，验证按 index 还原顺序
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.mark.unit
+class TestAsyncEmbeddingBatcher:
+    """异步 embedding 合并请求单元测试"""
+
+    @pytest.fixture
+    def api(self):
+        return FakeEmbeddingsAPI()
+
+    @pytest.fixture
+    def batcher(self, api):
+        return AsyncEmbeddingBatcher(SimpleNamespace(embeddings=api), "test-model", max_batch=8, max_wait=0.01)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, batcher, api):
+        """同一时间窗口内的并发请求合并为一次调用，结果按调用方对应"""
+        results = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "ccc"]))
+
+        assert results == [[1.0], [2.0], [3.0]]
+        assert api.calls == [["a", "bb", "ccc"]]
+
+    @pytest.mark.asyncio
+    async def test_batches_split_at_max_batch(self, api):
+        """超过 max_batch 的请求拆分为多次调用"""
+        batcher = AsyncEmbeddingBatcher(SimpleNamespace(embeddings=api), "test-model", max_batch=2, max_wait=0.01)
+
+        results = await asyncio.gather(*(batcher.embed("x" * n) for n in range(1, 6)))
+
+        assert results == [[float(n)] for n in range(1, 6)]
+        assert [len(call) for call in api.calls] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_failed_item_does_not_fail_the_batch(self, batcher, api):
+        """批量调用失败后逐条重试，只有出错的调用方收到异常"""
+        results = await asyncio.gather(
+            *(batcher.embed(text) for text in ["a", "bad", "ccc"]),
+            return_exceptions=True
+        )
+
+        assert results[0] == [1.0]
+        assert isinstance(results[1], ValueError)
+        assert results[2] == [3.0]
+        assert api.calls == [["a", "bad", "ccc"], ["a"], ["bad"], ["ccc"]]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_break_flush(self, batcher):
+        """调用方取消后批次仍能正常完成"""
+        cancelled = asyncio.ensure_future(batcher.embed("a"))
+        kept = asyncio.ensure_future(batcher.embed("bb"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await kept == [2.0]
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from app.services.memory._kernels import NUMBA_MIN_ROWS, cosine_scores, topk_cosine, warm_up
+
+
+def reference_scores(matrix, query):
+    """逐行计算的余弦相似度，作为对照"""
+    return np.array([
+        float(np.dot(row, query) / (np.linalg.norm(row) * np.linalg.norm(query)))
+        for row in matrix.astype(np.float64)
+    ])
+
+
+@pytest.mark.unit
+class TestTopkCosine:
+    """相似度内核单元测试"""
+
+    @pytest.fixture
+    def rng(self):
+        return np.random.default_rng(42)
+
+    @pytest.mark.parametrize("rows", [5, NUMBA_MIN_ROWS, NUMBA_MIN_ROWS * 4])
+    def test_scores_match_reference(self, rng, rows):
+        """小矩阵走 NumPy、大矩阵走 Numba（如已安装），结果都与逐行计算一致"""
+        matrix = rng.standard_normal((rows, 32)).astype(np.float32)
+        query = rng.standard_normal(32).astype(np.float32)
+
+        np.testing.assert_allclose(cosine_scores(matrix, query), reference_scores(matrix, query), atol=1e-5)
+
+    @pytest.mark.parametrize("rows", [5, NUMBA_MIN_ROWS * 4])
+    def test_topk_is_sorted_best_first(self, rng, rows):
+        """返回得分最高的 k 行，按得分从高到低排列"""
+        matrix = rng.standard_normal((rows, 32)).astype(np.float32)
+        query = rng.standard_normal(32).astype(np.float32)
+
+        indices, scores = topk_cosine(matrix, query, 3)
+
+        expected = np.argsort(-reference_scores(matrix, query))[:3]
+        assert list(indices) == list(expected)
+        assert list(scores) == sorted(scores, reverse=True)
+
+    def test_k_larger_than_rows(self, rng):
+        """k 大于行数时返回全部行"""
+        matrix = rng.standard_normal((2, 8)).astype(np.float32)
+
+        indices, scores = topk_cosine(matrix, matrix[1], 5)
+
+        assert list(indices) == [1, 0]
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+    def test_zero_vectors_do_not_divide_by_zero(self):
+        """零向量得分为 0，不产生 NaN"""
+        matrix = np.zeros((NUMBA_MIN_ROWS, 8), dtype=np.float32)
+
+        scores = cosine_scores(matrix, np.zeros(8, dtype=np.float32))
+
+        assert not np.isnan(scores).any()
+        assert np.all(scores == 0)
+
+    def test_warm_up(self):
+        """预热在模块导入后可直接调用"""
+        warm_up(dim=16)
@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.core.config import settings
+from app.services.memory.base_memory import RetrievalResult
+from app.services.memory.memory_manager import MemoryManager
+
+
+VECTORS = {
+    "我喜欢什么运动": [1.0, 0.0, 0.0],
+    "我喜欢哪些运动": [0.99, 0.05, 0.0],
+    "我住在哪里": [0.0, 1.0, 0.0],
+}
+
+
+@pytest.mark.unit
+class TestMemoryManagerCache:
+    """MemoryManager 的 embedding 缓存和对话内检索缓存单元测试"""
+
+    @pytest.fixture
+    def memory_system(self):
+        memory_system = Mock()
+        memory_system.embed.side_effect = lambda text: VECTORS[text]
+        memory_system.embed_async = AsyncMock(side_effect=lambda text: VECTORS[text])
+        memory_system.retrieve_context.side_effect = lambda query, max_results, query_embedding=None: (
+            RetrievalResult(memories=[f"关于「{query}」的记忆"])
+        )
+        return memory_system
+
+    @pytest.fixture
+    def manager(self, memory_system):
+        return MemoryManager(memory_system, "test")
+
+    def test_embedding_is_memoized(self, manager, memory_system):
+        """相同文本只调用一次 embeddings API"""
+        assert manager.embed_query("我住在哪里") == VECTORS["我住在哪里"]
+        assert manager.embed_query("我住在哪里") == VECTORS["我住在哪里"]
+
+        memory_system.embed.assert_called_once_with("我住在哪里")
+
+    def test_failed_embedding_is_not_memoized(self, manager, memory_system):
+        """embedding 失败返回 None 且不缓存，下次调用重试"""
+        memory_system.embed.side_effect = [None, VECTORS["我住在哪里"]]
+
+        assert manager.embed_query("我住在哪里") is None
+        assert manager.embed_query("我住在哪里") == VECTORS["我住在哪里"]
+        assert memory_system.embed.call_count == 2
+
+    def test_similar_query_reuses_retrieval(self, manager, memory_system):
+        """同一对话内的相似查询复用检索结果"""
+        first = manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-1", user_id=1)
+        second = manager.retrieve_context_sync("我喜欢哪些运动", conversation_id="conv-1", user_id=2)
+
+        assert memory_system.retrieve_context.call_count == 1
+        assert second.memories == first.memories
+        assert second.metadata == {"context_cache_hit": True, "user_id": 2}
+        assert "context_cache_hit" not in first.metadata
+
+    def test_cache_is_scoped_to_conversation(self, manager, memory_system):
+        """不同对话、不同 max_results 或不相似的查询都不命中"""
+        manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-1")
+        manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-2")
+        manager.retrieve_context_sync("我喜欢什么运动", max_results=3, conversation_id="conv-1")
+        manager.retrieve_context_sync("我住在哪里", conversation_id="conv-1")
+        manager.retrieve_context_sync("我喜欢什么运动")
+
+        assert memory_system.retrieve_context.call_count == 5
+
+    def test_expired_entries_are_not_reused(self, manager, memory_system, monkeypatch):
+        """超过 RAG_CONTEXT_CACHE_TTL 的检索结果不再复用"""
+        monkeypatch.setattr(settings, "RAG_CONTEXT_CACHE_TTL", -1)
+
+        manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-1")
+        manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-1")
+
+        assert memory_system.retrieve_context.call_count == 2
+
+    def test_failed_embedding_skips_context_cache(self, manager, memory_system):
+        """embedding 失败时不写入也不查询检索缓存"""
+        memory_system.embed.side_effect = lambda text: None
+
+        manager.retrieve_context_sync("我喜欢什么运动", conversation_id="conv-1")
+        manager.retrieve_context_sync("我喜欢哪些运动", conversation_id="conv-1")
+
+        assert memory_system.retrieve_context.call_count == 2
+        memory_system.retrieve_context.assert_called_with("我喜欢哪些运动", 5, query_embedding=None)
+
+    @pytest.mark.asyncio
+    async def test_async_similar_query_reuses_retrieval(self, manager, memory_system):
+        """异步路径同样复用对话内的检索结果"""
+        await manager.retrieve_context_async("我喜欢什么运动", conversation_id="conv-1")
+        second = await manager.retrieve_context_async("我喜欢哪些运动", conversation_id="conv-1")
+
+        assert memory_system.retrieve_context.call_count == 1
+        assert memory_system.embed_async.await_count == 2
+        assert second.metadata["context_cache_hit"] is True
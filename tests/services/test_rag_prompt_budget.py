@@ -0,0 +1,89 @@
+import pytest
+
+from app.core.config import settings
+from app.services.memory.base_memory import RetrievalResult
+from app.services.rag import rag_service
+from app.services.rag.rag_service import RAGService
+
+
+MEMORIES = ["记忆一：用户喜欢跑步", "记忆二：用户住在杭州", "记忆三：用户是工程师"]
+WEB_RESULTS = [
+    {"title": f"新闻{i}", "snippet": "杭州今天有马拉松比赛" * 5} for i in range(1, 4)
+]
+
+
+@pytest.mark.unit
+class TestBuildMessagesTokenBudget:
+    """RAG 提示词按上下文窗口裁剪的单元测试"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        # 按字符数计 token，避免依赖 tiktoken 编码文件
+        monkeypatch.setattr(rag_service, "_count_tokens", lambda text, model: len(text))
+        service = RAGService.__new__(RAGService)
+        service.model = "gpt-4o-mini"
+        return service
+
+    def prompt_tokens(self, service, memories, web_results):
+        """上下文窗口足够大时提示词的 token 数"""
+        result = RetrievalResult(memories=memories, web_results=web_results)
+        return service._build_messages("今天适合跑步吗", result)[1]
+
+    def build(self, service, monkeypatch, window):
+        monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", window)
+        result = RetrievalResult(memories=list(MEMORIES), web_results=list(WEB_RESULTS))
+        return service._build_messages("今天适合跑步吗", result)
+
+    def test_prompt_within_budget_is_kept(self, service, monkeypatch):
+        """预算充足时保留全部上下文"""
+        monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", 128000)
+        full = self.prompt_tokens(service, MEMORIES, WEB_RESULTS)
+
+        messages, tokens = self.build(service, monkeypatch, 128000)
+
+        assert tokens == full
+        assert tokens == sum(len(message["content"]) for message in messages)
+        assert "新闻3" in messages[1]["content"] and MEMORIES[2] in messages[1]["content"]
+
+    def test_web_results_are_dropped_before_memories(self, service, monkeypatch):
+        """超出预算时先从末尾丢弃网络结果，再丢弃记忆"""
+        monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", 128000)
+        without_web = self.prompt_tokens(service, MEMORIES, [])
+        one_web = self.prompt_tokens(service, MEMORIES, WEB_RESULTS[:1])
+
+        messages, tokens = self.build(service, monkeypatch, one_web + rag_service._PROMPT_HEADROOM_TOKENS)
+        content = messages[1]["content"]
+        assert tokens == one_web
+        assert "新闻1" in content and "新闻2" not in content
+        assert all(memory in content for memory in MEMORIES)
+
+        messages, tokens = self.build(service, monkeypatch, without_web + rag_service._PROMPT_HEADROOM_TOKENS - 1)
+        content = messages[1]["content"]
+        assert "Recent information from web search" not in content
+        assert MEMORIES[0] in content and MEMORIES[1] in content and MEMORIES[2] not in content
+
+    def test_everything_dropped_when_budget_is_too_small(self, service, monkeypatch):
+        """预算连最小提示词都放不下时丢弃全部上下文但仍返回消息"""
+        messages, tokens = self.build(service, monkeypatch, 10)
+
+        assert "No additional context available." in messages[1]["content"]
+        assert "今天适合跑步吗" in messages[1]["content"]
+        assert tokens == self.prompt_tokens(service, [], [])
+
+    def test_max_tokens_shrinks_to_fit_context_window(self, service, monkeypatch):
+        """提示词较长时 max_tokens 缩小到上下文窗口剩余空间"""
+        monkeypatch.setattr(settings, "LLM_MAX_OUTPUT_TOKENS", 500)
+        monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", 128000)
+        full = self.prompt_tokens(service, MEMORIES, WEB_RESULTS)
+        assert service._completion_params("今天适合跑步吗", RetrievalResult(
+            memories=list(MEMORIES), web_results=list(WEB_RESULTS)
+        ))["max_tokens"] == 500
+
+        # 窗口只比提示词多出头部空间时，全部上下文都能保留，回复只剩很小的空间
+        window = full + rag_service._PROMPT_HEADROOM_TOKENS
+        monkeypatch.setattr(settings, "LLM_CONTEXT_WINDOW", window)
+        params = service._completion_params("今天适合跑步吗", RetrievalResult(
+            memories=list(MEMORIES), web_results=list(WEB_RESULTS)
+        ))
+
+        assert params["max_tokens"] == min(500, window - full - rag_service._MESSAGE_OVERHEAD_TOKENS)
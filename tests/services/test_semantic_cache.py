@@ -0,0 +1,140 @@
+import pytest
+
+from app.services.rag.semantic_cache import SemanticResponseCache
+
+
+VECTORS = {
+    "今天天气怎么样": [1.0, 0.0, 0.0],
+    "今天的天气如何": [0.99, 0.05, 0.0],
+    "给我讲个笑话": [0.0, 1.0, 0.0],
+}
+
+
+class FakeEmbedder:
+    """按文本返回固定向量；failing=True 时模拟 embeddings API 失败"""
+
+    def __init__(self, failing: bool = False):
+        self.failing = failing
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return None if self.failing else VECTORS[text]
+
+    async def embed_async(self, text):
+        return self(text)
+
+
+@pytest.mark.unit
+class TestSemanticResponseCache:
+    """语义响应缓存单元测试"""
+
+    def make_cache(self, embedder, **kwargs):
+        kwargs.setdefault("similarity_threshold", 0.95)
+        kwargs.setdefault("ttl_seconds", 60)
+        return SemanticResponseCache(embedder, embedder.embed_async, **kwargs)
+
+    def test_hit_for_similar_message(self):
+        """相似问题命中同一对话内的缓存回答"""
+        cache = self.make_cache(FakeEmbedder())
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert cache.lookup(1, 2, "conv-1", "今天的天气如何") == "晴天"
+        assert cache.get_stats()["hits"] == 1
+
+    def test_miss_for_unrelated_message(self):
+        """不相关的问题不命中"""
+        cache = self.make_cache(FakeEmbedder())
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert cache.lookup(1, 2, "conv-1", "给我讲个笑话") is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_namespaced_by_conversation_and_prompt(self):
+        """缓存按用户、数字人、对话和系统提示词隔离"""
+        cache = self.make_cache(FakeEmbedder())
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天", system_prompt="人设A")
+
+        assert cache.lookup(1, 2, "conv-2", "今天天气怎么样", system_prompt="人设A") is None
+        assert cache.lookup(1, 3, "conv-1", "今天天气怎么样", system_prompt="人设A") is None
+        assert cache.lookup(9, 2, "conv-1", "今天天气怎么样", system_prompt="人设A") is None
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样", system_prompt="人设B") is None
+        assert cache.lookup(
+            1, 2, "conv-1", "今天天气怎么样",
+            system_prompt_hash=SemanticResponseCache.prompt_hash("人设A")
+        ) == "晴天"
+
+    def test_cold_namespace_skips_embedding(self):
+        """命名空间没有缓存条目时不调用 embedding"""
+        embedder = FakeEmbedder()
+        cache = self.make_cache(embedder)
+
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样") is None
+        assert embedder.calls == []
+
+    def test_expired_entries_are_not_returned(self):
+        """超过 TTL 的条目不再命中"""
+        cache = self.make_cache(FakeEmbedder(), ttl_seconds=-1)
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_failing_embedder_neither_stores_nor_hits(self):
+        """embedding 失败时既不写入也不命中，避免替代向量互相匹配"""
+        embedder = FakeEmbedder(failing=True)
+        cache = self.make_cache(embedder)
+
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+        assert cache.get_stats()["entries"] == 0
+
+        embedder.failing = False
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+        embedder.failing = True
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样") is None
+        assert cache.get_stats()["hits"] == 0
+
+    def test_namespace_eviction(self):
+        """超过命名空间上限时淘汰最久未使用的命名空间"""
+        cache = self.make_cache(FakeEmbedder(), max_namespaces=1)
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+        cache.store(1, 2, "conv-2", "今天天气怎么样", "多云")
+
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样") is None
+        assert cache.lookup(1, 2, "conv-2", "今天天气怎么样") == "多云"
+
+    def test_clear_by_user(self):
+        """按用户清理缓存"""
+        cache = self.make_cache(FakeEmbedder())
+        cache.store(1, 2, "conv-1", "今天天气怎么样", "晴天")
+        cache.store(7, 2, "conv-7", "今天天气怎么样", "多云")
+
+        cache.clear(user_id=1)
+
+        assert cache.lookup(1, 2, "conv-1", "今天天气怎么样") is None
+        assert cache.lookup(7, 2, "conv-7", "今天天气怎么样") == "多云"
+
+    @pytest.mark.asyncio
+    async def test_async_round_trip(self):
+        """异步接口使用 embed_async 读写缓存"""
+        cache = self.make_cache(FakeEmbedder())
+        await cache.store_async(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert await cache.lookup_async(1, 2, "conv-1", "今天的天气如何") == "晴天"
+
+    @pytest.mark.asyncio
+    async def test_async_without_embed_async_uses_executor(self):
+        """未提供 embed_async 时在线程池中调用同步 embedding"""
+        cache = SemanticResponseCache(FakeEmbedder(), similarity_threshold=0.95, ttl_seconds=60)
+        await cache.store_async(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert await cache.lookup_async(1, 2, "conv-1", "今天天气怎么样") == "晴天"
+
+    @pytest.mark.asyncio
+    async def test_async_failing_embedder_neither_stores_nor_hits(self):
+        """异步路径下 embedding 失败同样跳过缓存"""
+        cache = self.make_cache(FakeEmbedder(failing=True))
+        await cache.store_async(1, 2, "conv-1", "今天天气怎么样", "晴天")
+
+        assert cache.get_stats()["entries"] == 0
+        assert await cache.lookup_async(1, 2, "conv-1", "今天天气怎么样") is None
@@ -0,0 +1,94 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.utils.sse import KEEPALIVE_FRAME, chunk_frame, event_frame, token_frame, with_keepalive
+
+
+async def collect(frames):
+    return [frame async for frame in frames]
+
+
+@pytest.mark.unit
+class TestSSEFrames:
+    """SSE 帧编码单元测试"""
+
+    def test_frames_are_valid_json_events(self):
+        """预编码的帧与 json 序列化结果一致"""
+        for frame, expected in [
+            (chunk_frame('他说"你好"\n', 3), {"type": "chunk", "content": '他说"你好"\n', "chunk_id": 3}),
+            (token_frame("你好"), {"type": "token", "content": "你好"}),
+            (event_frame({"type": "done", "sources": ["memory"]}), {"type": "done", "sources": ["memory"]}),
+        ]:
+            assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+            assert orjson.loads(frame[len(b"data: "):-2]) == expected
+
+
+@pytest.mark.unit
+class TestWithKeepalive:
+    """SSE 保活包装单元测试"""
+
+    @pytest.mark.asyncio
+    async def test_fast_stream_is_passed_through(self):
+        """上游持续产出时不插入保活帧"""
+        async def frames():
+            for frame in [b"a", b"b", b"c"]:
+                yield frame
+
+        assert await collect(with_keepalive(frames(), interval=1)) == [b"a", b"b", b"c"]
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_gets_keepalive_frames(self):
+        """上游空闲超过 interval 时插入保活帧，且不丢失真实帧"""
+        async def frames():
+            yield b"a"
+            await asyncio.sleep(0.35)
+            yield b"b"
+
+        result = await collect(with_keepalive(frames(), interval=0.1))
+
+        assert result[0] == b"a" and result[-1] == b"b"
+        assert set(result[1:-1]) == {KEEPALIVE_FRAME}
+        assert len(result[1:-1]) >= 2
+
+    @pytest.mark.asyncio
+    async def test_custom_keepalive_frame(self):
+        """支持 str 帧的流使用自定义保活帧"""
+        async def frames():
+            await asyncio.sleep(0.15)
+            yield "data: x\n\n"
+
+        result = await collect(with_keepalive(frames(), interval=0.1, keepalive_frame=": ping\n\n"))
+
+        assert result == [": ping\n\n", "data: x\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_propagates(self):
+        """上游异常透传给调用方"""
+        async def frames():
+            yield b"a"
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await collect(with_keepalive(frames(), interval=1))
+
+    @pytest.mark.asyncio
+    async def test_closing_early_closes_upstream(self):
+        """客户端断开时取消等待中的读取并关闭上游生成器"""
+        closed = asyncio.Event()
+
+        async def frames():
+            try:
+                yield b"a"
+                await asyncio.sleep(10)
+                yield b"b"
+            finally:
+                closed.set()
+
+        stream = with_keepalive(frames(), interval=0.05)
+        assert await stream.__anext__() == b"a"
+        assert await stream.__anext__() == KEEPALIVE_FRAME
+        await stream.aclose()
+
+        assert closed.is_set()